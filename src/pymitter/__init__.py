@@ -12,17 +12,44 @@ __contact__ = "https://github.com/riga/pymitter"
 __license__ = "BSD-3-Clause"
 __status__ = "Development"
 __version__ = "1.1.3"
-__all__ = ["EventEmitter", "Listener"]
+__all__ = [
+    "EmitError",
+    "EventEmitter",
+    "EventHandle",
+    "EventQueue",
+    "Instrumentation",
+    "Listener",
+    "LoopRunner",
+    "Metric",
+    "Namespace",
+    "Subscription",
+    "ThreadSafeEventEmitter",
+]
 
 import asyncio
+import concurrent.futures
 import fnmatch
+import functools
+import heapq
+import inspect
+import itertools
+import operator
+import re
+import sys
+import threading
 import time
-from collections.abc import Awaitable, Iterator
-from typing import Any, Callable, TypeVar, overload
+import types
+import weakref
+from collections import OrderedDict
+from collections.abc import Awaitable, Iterable, Iterator, Mapping
+from typing import Any, Callable, Literal, TypeVar, overload
 
 F = TypeVar("F", bound=Callable[..., Any])
 T = TypeVar("T")
 
+# immutable mapping shared by all nodes without child nodes or listeners, replaced by a dict on first insertion
+empty_mapping: Mapping[Any, Any] = types.MappingProxyType({})
+
 
 class EventEmitter:
     """
@@ -33,10 +60,47 @@ class EventEmitter:
 
     When *new_listener* is *True*, a ``"new_listener"`` event is emitted every time a new listener is registered with
     arguments ``(func, event=None)``. *max_listeners* configures the total maximum number of event listeners. A negative
-    numbers means that this number is unlimited.
+    numbers means that this number is unlimited. Limits for listeners registered to specific events can be configured
+    through :py:meth:`set_max_listeners`.
+
+    Listeners to invoke per emitted event name are resolved once and kept in a dispatch cache with up to *cache_size*
+    entries, evicting the least recently emitted event names first. Entries are invalidated only when listeners they
+    depend on are added or removed. A negative number means that the cache is unbounded, zero disables it.
+
+    When a :py:class:`LoopRunner` is passed as *runner*, awaitables of async listeners invoked by :py:meth:`emit` are
+    submitted to its long-lived event loop instead of starting a new one per call.
+
+    Synchronous listeners can be dispatched to a :py:class:`concurrent.futures.Executor`, either configured per listener
+    or for all of them through *executor*. When *ordered* is *True*, listeners dispatched to the same executor during
+    an emit are invoked one after another in their registration order within a single task.
+
+    When *prune* is *True*, nodes of events without any remaining listeners are removed as soon as listeners are
+    removed or expire. Otherwise, they can be removed on demand with :py:meth:`compact`.
+
+    When *weak* is *True*, listeners only keep weak references to their functions by default, see :py:meth:`on`.
+
+    Metrics of emitted events and called listeners are only collected after enabling an :py:class:`Instrumentation`
+    through :py:meth:`instrument`, leaving the dispatch unchanged otherwise.
+
+    *error_policy* defines how exceptions raised by listeners are handled. With ``"raise"``, the first exception is
+    raised immediately and remaining listeners are not called. With ``"continue"``, all listeners are called and each
+    exception is passed to *error_handler* as ``(exc, event, func)``, or emitted as an ``"error"`` event with the same
+    arguments when no handler is set. As in Node.js, exceptions are still raised when there is no ``"error"`` listener,
+    as well as exceptions raised by ``"error"`` listeners themselves. With ``"collect"``, all listeners are called and
+    exceptions are raised together in an :py:class:`EmitError` at the end of :py:meth:`emit`, :py:meth:`emit_many`,
+    :py:meth:`emit_batch` and their async versions. Other emit methods raise the first exception in this case. Policies
+    apply to synchronous functions as well as to awaited async functions and, in async emits, to functions dispatched to
+    executors.
+
+    When *compiled* is *True*, a dispatcher function is generated for each emitted event name and its current
+    listeners, calling plain functions directly and only checking ttls, async functions and executors of listeners
+    that need it. Dispatchers are generated again once listeners change, and are not used while instrumented or when
+    the dispatch cache is disabled.
     """
 
     new_listener_event = "new_listener"
+    error_event = "error"
+    error_policies = ("raise", "continue", "collect")
 
     def __init__(
         self,
@@ -45,26 +109,135 @@ class EventEmitter:
         wildcard: bool = False,
         new_listener: bool = False,
         max_listeners: int = -1,
+        cache_size: int = 256,
+        runner: LoopRunner | None = None,
+        executor: concurrent.futures.Executor | None = None,
+        ordered: bool = False,
+        prune: bool = True,
+        weak: bool = False,
+        error_policy: str = "raise",
+        error_handler: Callable[[Exception, str, Callable[..., Any]], Any] | None = None,
+        compiled: bool = False,
     ) -> None:
+        if error_policy not in self.error_policies:
+            raise ValueError(
+                f"unknown error policy '{error_policy}', must be one of {', '.join(self.error_policies)}",
+            )
+
         # store attributes
         self.new_listener = new_listener
         self.max_listeners = max_listeners
+        self.cache_size = cache_size
+        self.runner = runner
+        self.executor = executor
+        self.ordered = ordered
+        self.prune = prune
+        self.weak = weak
+        self.error_policy = error_policy
+        self.error_handler = error_handler
+
+        # instrumentation collecting metrics, set by instrument()
+        self.instrumentation: Instrumentation | None = None
 
         # tree of nodes keeping track of nested events
         self._event_tree = Tree(wildcard=wildcard, delimiter=delimiter)
 
-        # flat list of listeners triggered on "any" event
-        self._any_listeners: list[Listener] = []
+        # flat, ordered mapping of listeners triggered on "any" event
+        self._any_listeners: dict[Listener, None] = {}
+
+        # lru cache mapping emitted event names to ordered tuples of listeners to invoke
+        self._dispatch_cache: OrderedDict[str, tuple[Listener, ...]] = OrderedDict()
+
+        # counter that is increased whenever cached entries are invalidated
+        self._cache_version = 0
+
+        # maximum numbers of listeners registered to specific events
+        self._event_max_listeners: dict[str, int] = {}
+
+        # generated dispatchers per event name, stored with the listeners and settings they were generated for
+        self._dispatchers: dict[str, tuple[tuple[Listener, ...], Any, str, Callable[..., None]]] = {}
+        if compiled:
+            self._call_listeners = self._call_listeners_compiled  # type: ignore[method-assign]
 
     @property
     def num_listeners(self) -> int:
-        return self._event_tree.num_listeners() + len(self._any_listeners)
+        return self._event_tree.count + len(self._any_listeners)
+
+    def set_max_listeners(self, n: int, event: str | None = None) -> None:
+        """
+        Sets the maximum number of listeners registered to *event* to *n*. When *event* is *None*, the total maximum
+        :py:attr:`max_listeners` is set instead. A negative number means that this number is unlimited.
+        """
+        if event is None:
+            self.max_listeners = n
+        elif n < 0:
+            self._event_max_listeners.pop(event, None)
+        else:
+            self._event_max_listeners[event] = n
+
+    def get_max_listeners(self, event: str | None = None) -> int:
+        """
+        Returns the maximum number of listeners registered to *event*, or the total maximum :py:attr:`max_listeners`
+        when *event* is *None*.
+        """
+        if event is None:
+            return self.max_listeners
+        return self._event_max_listeners.get(event, -1)
+
+    def _num_event_listeners(self, event: str) -> int:
+        # number of listeners registered to exactly *event*
+        node = self._event_tree.get_node(event)
+        return 0 if node is None else len(node.listeners)
+
+    @overload
+    def on(
+        self,
+        event: str,
+        func: F,
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[False] = False,
+    ) -> F: ...
+
+    @overload
+    def on(
+        self,
+        event: str,
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[False] = False,
+    ) -> Callable[[F], F]: ...
 
     @overload
-    def on(self, event: str, func: F, *, ttl: int = -1) -> F: ...
+    def on(
+        self,
+        event: str,
+        func: Callable[..., Any],
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[True],
+    ) -> Subscription: ...
 
     @overload
-    def on(self, event: str, *, ttl: int = -1) -> Callable[[F], F]: ...
+    def on(
+        self,
+        event: str,
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[True],
+    ) -> Callable[[Callable[..., Any]], Subscription]: ...
 
     def on(
         self,
@@ -72,65 +245,170 @@ class EventEmitter:
         func: F | None = None,
         *,
         ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: bool = False,
     ):
         """
         Registers a function to an event. *ttl* defines the times to listen with negative values meaning infinity. When
-        *func* is *None*, decorator usage is assumed. Returns the wrapped function.
-        """
+        *func* is *None*, decorator usage is assumed. Returns the wrapped function, or a :py:class:`Subscription` when
+        *subscription* is *True* that allows removing exactly this registration in constant time.
+
+        A synchronous function can be dispatched to an *executor* when called, which defaults to the
+        :py:attr:`executor` of the emitter.
 
-        def on(func: F) -> F:
-            # do not register the function when the maximum would be exceeded
-            if 0 <= self.max_listeners <= self.num_listeners:
-                return func
+        When *batch* is *True*, the function is called with a single list of ``(args, kwargs)`` pairs instead, which
+        contains all arguments of events emitted together via :py:meth:`emit_many` or :py:meth:`emit_batch`.
 
-            # create a new listener and add it
-            self._event_tree.add_listener(event, Listener(func, event, ttl))
+        When *weak* is *True*, only a weak reference to the function is kept, which defaults to the :py:attr:`weak`
+        attribute of the emitter. Bound methods are referenced through :py:class:`weakref.WeakMethod`, so that they do
+        not keep their objects alive. The function is removed as soon as it is garbage collected.
+        """
+
+        def on(func: F) -> F | Subscription:
+            listener = self._create_listener(func, event, ttl, executor, batch, weak)
 
-            if self.new_listener and event != self.new_listener_event:
+            if self._add_listener(event, listener) and self.new_listener and event != self.new_listener_event:
                 self.emit(self.new_listener_event, func, event)
 
-            return func
+            return Subscription(self, listener) if subscription else func
 
         return on(func) if func else on
 
     @overload
-    def once(self, event: str, func: F) -> F: ...
+    def once(
+        self,
+        event: str,
+        func: F,
+        *,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[False] = False,
+    ) -> F: ...
+
+    @overload
+    def once(
+        self,
+        event: str,
+        *,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[False] = False,
+    ) -> Callable[[F], F]: ...
+
+    @overload
+    def once(
+        self,
+        event: str,
+        func: Callable[..., Any],
+        *,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[True],
+    ) -> Subscription: ...
 
     @overload
-    def once(self, event: str) -> Callable[[F], F]: ...
+    def once(
+        self,
+        event: str,
+        *,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[True],
+    ) -> Callable[[Callable[..., Any]], Subscription]: ...
 
-    def once(self, event: str, func: F | None = None):
+    def once(
+        self,
+        event: str,
+        func: F | None = None,
+        *,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: bool = False,
+    ):
         """
         Registers a function to an event that is called once. When *func* is *None*, decorator usage is assumed. Returns
-        the wrapped function.
+        the wrapped function, or a :py:class:`Subscription` when *subscription* is *True*.
         """
-        return self.on(event, func, ttl=1) if func else self.on(event, ttl=1)
+        kwargs = {"ttl": 1, "executor": executor, "batch": batch, "weak": weak, "subscription": subscription}
+        return self.on(event, func, **kwargs) if func else self.on(event, **kwargs)  # type: ignore[call-overload]
 
     @overload
-    def on_any(self, func: F, *, ttl: int = -1) -> F: ...
+    def on_any(
+        self,
+        func: F,
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[False] = False,
+    ) -> F: ...
+
+    @overload
+    def on_any(
+        self,
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[False] = False,
+    ) -> Callable[[F], F]: ...
 
     @overload
-    def on_any(self, *, ttl: int = -1) -> Callable[[F], F]: ...
+    def on_any(
+        self,
+        func: Callable[..., Any],
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[True],
+    ) -> Subscription: ...
+
+    @overload
+    def on_any(
+        self,
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: Literal[True],
+    ) -> Callable[[Callable[..., Any]], Subscription]: ...
 
-    def on_any(self, func: F | None = None, *, ttl: int = -1):
+    def on_any(
+        self,
+        func: F | None = None,
+        *,
+        ttl: int = -1,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+        weak: bool | None = None,
+        subscription: bool = False,
+    ):
         """
         Registers a function that is called every time an event is emitted. *ttl* defines the times to listen with
         negative values meaning infinity. When *func* is *None*, decorator usage is assumed. Returns the wrapped
-        function.
+        function, or a :py:class:`Subscription` when *subscription* is *True*. See :py:meth:`on` for more info on
+        *executor*, *batch* and *weak*.
         """
 
-        def on_any(func: F) -> F:
-            # do not register the function when the maximum would be exceeded
-            if 0 <= self.max_listeners <= self.num_listeners:
-                return func
-
-            # create a new listener and add it
-            self._any_listeners.append(Listener(func, "", ttl))
+        def on_any(func: F) -> F | Subscription:
+            listener = self._create_listener(func, "", ttl, executor, batch, weak)
 
-            if self.new_listener:
+            if self._add_any_listener(listener) and self.new_listener:
                 self.emit(self.new_listener_event, func)
 
-            return func
+            return Subscription(self, listener) if subscription else func
 
         return on_any(func) if func else on_any
 
@@ -145,12 +423,28 @@ class EventEmitter:
         Removes a function that is registered to an event and returns it. When *func* is *None*, all listeners
         registered to *event* are removed and *None* is returned.
         """
+        # listeners to drop metrics of
+        if self.instrumentation is not None:
+            self.instrumentation.remove_listeners(
+                listener
+                for node in self._event_tree.find_nodes(event)
+                for listener in node.listeners
+                if func is None or listener.func == func
+            )
+
         if func is None:
             # remove all listeners
-            self._event_tree.remove_listeners_by_event(event)
-            return None
+            nodes = self._event_tree.remove_listeners_by_event(event)
+        else:
+            nodes = self._event_tree.remove_listeners_by_func(event, func)
+
+        # invalidate cached listeners of all affected nodes, then remove empty ones
+        for node in nodes:
+            self._invalidate_cache(node.path)
+        if self.prune:
+            for node in nodes:
+                self._event_tree.prune(node)
 
-        self._event_tree.remove_listeners_by_func(event, func)
         return func
 
     @overload
@@ -166,8 +460,7 @@ class EventEmitter:
         """
 
         def off_any(func: F) -> F:
-            self._any_listeners[:] = [listener for listener in self._any_listeners if listener.func != func]
-
+            self._remove_any_listeners(func)
             return func
 
         return off_any(func) if func else off_any
@@ -177,7 +470,122 @@ class EventEmitter:
         Removes all registered functions.
         """
         self._event_tree.clear()
-        del self._any_listeners[:]
+        self._any_listeners.clear()
+        self._dispatch_cache.clear()
+        self._dispatchers.clear()
+        self._cache_version += 1
+        if self.instrumentation is not None:
+            self.instrumentation.listeners.clear()
+
+    def instrument(self, instrumentation: Instrumentation | None = None, **kwargs: Any) -> Instrumentation:
+        """
+        Enables the collection of metrics of emitted events and called listeners through an *instrumentation*, which
+        is created by forwarding all *kwargs* to :py:class:`Instrumentation` when *None*, and returns it. Until
+        :py:meth:`uninstrument` is called, all emits are dispatched through instrumented versions of the internal
+        dispatch methods, which are not involved at all otherwise.
+        """
+        if instrumentation is None:
+            instrumentation = Instrumentation(**kwargs)
+        self.instrumentation = instrumentation
+
+        # shadow dispatch methods per instance, so that the default path remains free of any checks
+        self._emit = self._emit_instrumented
+        self._emit_many = self._emit_many_instrumented
+        self._call_listener = self._call_listener_instrumented
+
+        return instrumentation
+
+    def uninstrument(self) -> Instrumentation | None:
+        """
+        Disables the collection of metrics and returns the previous :py:class:`Instrumentation`, if any.
+        """
+        instrumentation, self.instrumentation = self.instrumentation, None
+        for attr in ("_emit", "_emit_many", "_call_listener"):
+            self.__dict__.pop(attr, None)
+
+        return instrumentation
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns a snapshot of the metrics collected by the current :py:class:`Instrumentation` as returned by
+        :py:meth:`Instrumentation.stats`, or empty metrics when not instrumented.
+        """
+        return (self.instrumentation or Instrumentation()).stats()
+
+    def compact(self) -> int:
+        """
+        Removes all nodes of events without any remaining listeners and returns their number. This is only required
+        when :py:attr:`prune` is *False*.
+        """
+        return self._event_tree.prune_all()
+
+    def _create_listener(
+        self,
+        func: Callable[..., Any],
+        event: str,
+        ttl: int,
+        executor: concurrent.futures.Executor | None,
+        batch: bool,
+        weak: bool | None,
+    ) -> Listener:
+        if not (self.weak if weak is None else weak):
+            return Listener(func, event, ttl, executor=executor, batch=batch)
+
+        # remove weak listeners as soon as their function is garbage collected
+        return WeakListener(func, event, ttl, executor=executor, batch=batch, callback=self._remove_listener)
+
+    def _add_listener(self, event: str, listener: Listener) -> bool:
+        # do not register the listener when the total or per-event maximum would be exceeded
+        if 0 <= self.max_listeners <= self.num_listeners or (
+            event in self._event_max_listeners and self._event_max_listeners[event] <= self._num_event_listeners(event)
+        ):
+            return False
+
+        # add the listener
+        self._event_tree.add_listener(event, listener)
+        self._invalidate_cache(event)
+
+        return True
+
+    def _add_any_listener(self, listener: Listener) -> bool:
+        # do not register the listener when the maximum would be exceeded
+        if 0 <= self.max_listeners <= self.num_listeners:
+            return False
+
+        # add the listener
+        self._any_listeners[listener] = None
+        self._invalidate_cache_any()
+
+        return True
+
+    def _remove_any_listeners(self, func: Callable[..., Any]) -> None:
+        listeners = [listener for listener in self._any_listeners if listener.func == func]
+        for listener in listeners:
+            del self._any_listeners[listener]
+        if listeners:
+            self._invalidate_cache_any()
+            if self.instrumentation is not None:
+                self.instrumentation.remove_listeners(listeners)
+
+    def _remove_listener(self, listener: Listener) -> bool:
+        # removes a single listener in constant time and returns whether it was registered
+        node = listener.node
+        if node is None:
+            if listener not in self._any_listeners:
+                return False
+            del self._any_listeners[listener]
+            self._invalidate_cache_any()
+        else:
+            if not node.remove_listener(listener):
+                return False
+            self._invalidate_cache(listener.event)
+            if self.prune:
+                self._event_tree.prune(node)
+
+        if self.instrumentation is not None:
+            self.instrumentation.remove_listeners((listener,))
+
+        return True
 
     def listeners(self, event: str) -> list[Callable[..., Any]]:
         """
@@ -195,116 +603,1062 @@ class EventEmitter:
         """
         Returns all registered functions, ordered by their registration time.
         """
-        listeners = list(self._any_listeners)
+        node_listeners = [self._any_listeners]
         nodes = list(self._event_tree.nodes.values())
         while nodes:
-            node = nodes.pop(0)
+            node = nodes.pop()
             nodes.extend(node.nodes.values())
-            listeners.extend(node.listeners)
+            node_listeners.append(node.listeners)
+
+        return [listener.func for listener in merge_listeners(*node_listeners)]
+
+    def _invalidate_cache(self, event: str) -> None:
+        # drop cached entries and dispatchers of emitted event names that reach listeners registered to *event*
+        self._cache_version += 1
+        caches: tuple[dict[str, Any], ...] = (self._dispatch_cache, self._dispatchers)
+        for cache in caches:
+            cache.pop(event, None)
+            if self._event_tree.wildcard and cache:
+                for key in [key for key in cache if self._event_tree.match(key, event)]:
+                    del cache[key]
+
+    def _invalidate_cache_any(self) -> None:
+        # "any" listeners are part of all entries, except for the one of the new listener event
+        self._cache_version += 1
+        cache = self._dispatch_cache
+        entry = cache.get(self.new_listener_event)
+        cache.clear()
+        if entry is not None:
+            cache[self.new_listener_event] = entry
+        self._dispatchers.clear()
+
+    def _find_listeners(self, event: str) -> tuple[Listener, ...]:
+        # cache lookup
+        cache = self._dispatch_cache
+        listeners = cache.get(event)
+        if listeners is not None:
+            cache.move_to_end(event)
+            return listeners
+
+        # resolve listeners in the order of their registration
+        _listeners = self._event_tree.find_listeners(event)
+        if event != self.new_listener_event and self._any_listeners:
+            _listeners = merge_listeners(_listeners, self._any_listeners)
+        listeners = tuple(_listeners)
+
+        # store the entry and evict the least recently used one when the cache is full
+        if self.cache_size != 0:
+            cache[event] = listeners
+            if 0 < self.cache_size < len(cache):
+                cache.popitem(last=False)
+
+        return listeners
+
+    def _emit(
+        self,
+        event: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop | None = None,
+        errors: list[Exception] | None = None,
+        listeners: tuple[Listener, ...] | None = None,
+    ) -> list[Any]:
+        # returns awaitables of coroutine functions and futures of functions dispatched to executors, which are
+        # asyncio futures when a loop is given, exceptions of listeners are added to errors when collected, and
+        # listeners are only resolved when not already given
+        pending: list[Any] = []
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]] = {}
+        if listeners is None:
+            listeners = self._find_listeners(event)
+        self._call_listeners(event, listeners, args, kwargs, loop, pending, ordered_calls, errors)
+        self._submit_ordered(ordered_calls, loop, pending)
+
+        return pending
+
+    def _emit_many(
+        self,
+        items: Iterable[tuple[str, tuple[Any, ...], dict[str, Any]]],
+        loop: asyncio.AbstractEventLoop | None = None,
+        errors: list[Exception] | None = None,
+    ) -> list[Any]:
+        # same as _emit, but for multiple events and listeners being resolved once per distinct event name
+        pending: list[Any] = []
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]] = {}
+        batches: dict[Listener, list[tuple[tuple[Any, ...], dict[str, Any]]]] = {}
+        resolved: dict[str, tuple[Listener, ...]] = {}
+        version = self._cache_version
+        for event, args, kwargs in items:
+            # resolve listeners again when they changed in the meantime
+            if self._cache_version != version:
+                resolved.clear()
+                version = self._cache_version
+            listeners = resolved.get(event)
+            if listeners is None:
+                listeners = resolved[event] = self._find_listeners(event)
+
+            self._call_listeners(event, listeners, args, kwargs, loop, pending, ordered_calls, errors, batches)
+
+        # call batch listeners once
+        for listener, batch in batches.items():
+            self._call_listener(listener, (batch,), {}, loop, pending, ordered_calls, listener.event, errors)
+
+        self._submit_ordered(ordered_calls, loop, pending)
+
+        return pending
+
+    def _emit_instrumented(
+        self,
+        event: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop | None = None,
+        errors: list[Exception] | None = None,
+        listeners: tuple[Listener, ...] | None = None,
+    ) -> list[Any]:
+        instrumentation: Instrumentation = self.instrumentation  # type: ignore[assignment]
+        if instrumentation.pre_dispatch is not None:
+            instrumentation.pre_dispatch(event, args, kwargs)
+        t0 = time.perf_counter_ns()
+        try:
+            return type(self)._emit(self, event, args, kwargs, loop=loop, errors=errors, listeners=listeners)
+        finally:
+            instrumentation.add_event(event, args, kwargs, time.perf_counter_ns() - t0)
+
+    def _emit_many_instrumented(
+        self,
+        items: Iterable[tuple[str, tuple[Any, ...], dict[str, Any]]],
+        loop: asyncio.AbstractEventLoop | None = None,
+        errors: list[Exception] | None = None,
+    ) -> list[Any]:
+        instrumentation: Instrumentation = self.instrumentation  # type: ignore[assignment]
+
+        # items are dispatched one after another, so measure the time until the next item is requested
+        def instrumented_items() -> Iterator[tuple[str, tuple[Any, ...], dict[str, Any]]]:
+            for event, args, kwargs in items:
+                if instrumentation.pre_dispatch is not None:
+                    instrumentation.pre_dispatch(event, args, kwargs)
+                t0 = time.perf_counter_ns()
+                yield (event, args, kwargs)
+                instrumentation.add_event(event, args, kwargs, time.perf_counter_ns() - t0)
+
+        return type(self)._emit_many(self, instrumented_items(), loop=loop, errors=errors)
+
+    def _call_listener_instrumented(
+        self,
+        listener: Listener,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop | None,
+        pending: list[Any],
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]],
+        event: str = "",
+        errors: list[Exception] | None = None,
+    ) -> Any:
+        instrumentation: Instrumentation = self.instrumentation  # type: ignore[assignment]
+        if not instrumentation.listeners_enabled:
+            return type(self)._call_listener(self, listener, args, kwargs, loop, pending, ordered_calls, event, errors)
+
+        t0 = time.perf_counter_ns()
+        try:
+            return type(self)._call_listener(self, listener, args, kwargs, loop, pending, ordered_calls, event, errors)
+        finally:
+            instrumentation.add_listener(listener, time.perf_counter_ns() - t0)
+
+    def _call_listeners(
+        self,
+        event: str,
+        listeners: tuple[Listener, ...],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop | None,
+        pending: list[Any],
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]],
+        errors: list[Exception] | None = None,
+        batches: dict[Listener, list[tuple[tuple[Any, ...], dict[str, Any]]]] | None = None,
+    ) -> None:
+        # call listeners in order
+        for listener in listeners:
+            # skip listeners that expired during a batch
+            if listener.ttl == 0:
+                continue
+
+            if not listener.batch:
+                self._call_listener(listener, args, kwargs, loop, pending, ordered_calls, event, errors)
+            elif batches is None:
+                self._call_listener(listener, ([(args, kwargs)],), {}, loop, pending, ordered_calls, event, errors)
+            else:
+                batches.setdefault(listener, []).append((args, kwargs))
+
+    def _call_listeners_compiled(
+        self,
+        event: str,
+        listeners: tuple[Listener, ...],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop | None,
+        pending: list[Any],
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]],
+        errors: list[Exception] | None = None,
+        batches: dict[Listener, list[tuple[tuple[Any, ...], dict[str, Any]]]] | None = None,
+    ) -> None:
+        # instrumented listener calls and uncached listeners, which would require generating dispatchers per emit,
+        # take the generic path
+        if self.instrumentation is not None or self.cache_size == 0:
+            call_listeners = type(self)._call_listeners
+            call_listeners(self, event, listeners, args, kwargs, loop, pending, ordered_calls, errors, batches)
+            return
+
+        # generate the dispatcher again when listeners or settings it depends on changed
+        entry = self._dispatchers.get(event)
+        if entry is None or entry[0] is not listeners or entry[1] is not self.executor or entry[2] != self.error_policy:
+            if 0 < self.cache_size <= len(self._dispatchers):
+                self._dispatchers.clear()
+            entry = (listeners, self.executor, self.error_policy, self._compile_dispatcher(event, listeners))
+            self._dispatchers[event] = entry
+
+        entry[3](args, kwargs, loop, pending, ordered_calls, errors, batches)
+
+    def _compile_dispatcher(self, event: str, listeners: tuple[Listener, ...]) -> Callable[..., None]:
+        # generates a function making all calls of _call_listeners for the given listeners, with plain functions
+        # being called directly, and all other listeners being passed to _call_listener
+        namespace: dict[str, Any] = {
+            "event": event,
+            "call": self._call_listener,
+            "handle_error": self._handle_error,
+        }
+        lines = ["def dispatch(args, kwargs, loop, pending, ordered_calls, errors, batches):"]
+        for i, listener in enumerate(listeners):
+            namespace[f"l{i}"] = listener
+            simple = listener.ttl < 0 and not listener.batch and not isinstance(listener, WeakListener)
+            if simple and listener.kind == Listener.SYNC and listener.executor is None and self.executor is None:
+                namespace[f"f{i}"] = listener.func
+                if self.error_policy == "raise":
+                    lines.append(f"    f{i}(*args, **kwargs)")
+                else:
+                    lines.extend(
+                        [
+                            "    try:",
+                            f"        f{i}(*args, **kwargs)",
+                            "    except Exception as e:",
+                            f"        handle_error(e, event, l{i}, loop, pending, errors)",
+                        ]
+                    )
+            elif simple and listener.kind != Listener.SYNC and self.error_policy == "raise":
+                namespace[f"f{i}"] = listener.func
+                lines.append(f"    pending.append(f{i}(*args, **kwargs))")
+            elif not listener.batch:
+                lines.extend(
+                    [
+                        f"    if l{i}.ttl != 0:",
+                        f"        call(l{i}, args, kwargs, loop, pending, ordered_calls, event, errors)",
+                    ]
+                )
+            else:
+                lines.extend(
+                    [
+                        f"    if l{i}.ttl != 0:",
+                        "        if batches is None:",
+                        f"            call(l{i}, ([(args, kwargs)],), {{}}, loop, pending, ordered_calls, event, errors)",
+                        "        else:",
+                        f"            batches.setdefault(l{i}, []).append((args, kwargs))",
+                    ]
+                )
+        if not listeners:
+            lines.append("    pass")
+
+        exec(compile("\n".join(lines), f"<pymitter dispatcher of '{event}'>", "exec"), namespace)  # noqa: S102
+        return namespace.pop("dispatch")
+
+    def _call_listener(
+        self,
+        listener: Listener,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop | None,
+        pending: list[Any],
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]],
+        event: str = "",
+        errors: list[Exception] | None = None,
+    ) -> Any:
+        # returns the result of synchronous functions that are called directly, or skipped when not called at all
+        # skip weak listeners whose function was garbage collected after the listeners were resolved
+        func: Callable[..., Any] | None = listener.func
+        if func is None:
+            return skipped
+
+        # consume the ttl atomically, so that concurrent emits call the listener exactly ttl times, and since
+        # listeners can emit events themselves, deregister them before calling once expired
+        if listener.ttl >= 0:
+            if not listener.consume():
+                return skipped
+            if listener.ttl == 0:
+                self._remove_listener(listener)
+
+        executor = listener.executor
+        if executor is None and listener.kind == Listener.SYNC:
+            executor = self.executor
+
+        if executor is None:
+            try:
+                res = func(*args, **kwargs)
+            except Exception as e:
+                self._handle_error(e, event, listener, loop, pending, errors)
+                return None
+            if listener.kind == Listener.SYNC:
+                return res
+            pending.append(res if self.error_policy == "raise" else self._guard(res, event, listener, errors))
+        elif self.ordered:
+            ordered_calls.setdefault(executor, []).append((func, args, kwargs))
+        elif loop is None or self.error_policy == "raise":
+            pending.append(self._submit(executor, loop, func, args, kwargs))
+        else:
+            future = as_awaitable(self._submit(executor, loop, func, args, kwargs))
+            pending.append(self._guard(future, event, listener, errors))
+
+        return None
 
-        # sort them
-        listeners = sorted(listeners, key=lambda listener: listener.time)
+    def _handle_error(
+        self,
+        exc: Exception,
+        event: str,
+        listener: Listener,
+        loop: asyncio.AbstractEventLoop | None,
+        pending: list[Any],
+        errors: list[Exception] | None,
+    ) -> None:
+        # applies the error policy to an exception raised by a synchronous listener
+        if errors is not None:
+            errors.append(exc)
+        elif self.error_policy != "continue":
+            raise exc
+        elif self.error_handler is not None:
+            self.error_handler(exc, event, listener.func)  # type: ignore[arg-type]
+        elif event == self.error_event or not self._find_listeners(self.error_event):
+            # as in node, exceptions of error listeners themselves and those without any error listener are raised
+            raise exc
+        else:
+            pending.extend(self._emit(self.error_event, (exc, event, listener.func), {}, loop=loop))
+
+    async def _guard(self, awaitable: Awaitable, event: str, listener: Listener, errors: list[Exception] | None) -> Any:
+        # applies the error policy to an exception raised by an awaited listener
+        try:
+            return await awaitable
+        except Exception as e:
+            if errors is not None:
+                errors.append(e)
+            elif self.error_policy != "continue":
+                raise
+            elif self.error_handler is not None:
+                self.error_handler(e, event, listener.func)  # type: ignore[arg-type]
+            elif event == self.error_event or not self._find_listeners(self.error_event):
+                raise
+            else:
+                await self.emit_async(self.error_event, e, event, listener.func)
+        return None
+
+    def _new_errors(self) -> list[Exception] | None:
+        # list for collecting exceptions of listeners when required by the error policy
+        return [] if self.error_policy == "collect" else None
 
-        return [listener.func for listener in listeners]
+    def _raise_errors(self, errors: list[Exception] | None, event: str) -> None:
+        if errors:
+            raise EmitError(f"{len(errors)} listener(s) of '{event}' raised an exception", errors)
 
-    def _emit(self, event: str, *args: Any, **kwargs: Any) -> list[Awaitable]:
-        listeners = self._event_tree.find_listeners(event)
-        if event != self.new_listener_event:
-            listeners.extend(self._any_listeners)
-        listeners = sorted(listeners, key=lambda listener: listener.time)
+    @classmethod
+    def _submit_ordered(
+        cls,
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]],
+        loop: asyncio.AbstractEventLoop | None,
+        pending: list[Any],
+    ) -> None:
+        # submit calls per executor to be made in order
+        for executor, calls in ordered_calls.items():
+            pending.append(cls._submit(executor, loop, call_in_order, (calls,), {}))
 
-        # call listeners in order, keep track of awaitables from coroutines functions
-        awaitables = []
+    @classmethod
+    def _submit(
+        cls,
+        executor: concurrent.futures.Executor,
+        loop: asyncio.AbstractEventLoop | None,
+        func: Callable[..., Any],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> concurrent.futures.Future | asyncio.Future:
+        if loop is None:
+            return executor.submit(func, *args, **kwargs)
+        return loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+    def _emit_collect(
+        self,
+        event: str,
+        listeners: Iterable[Listener],
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        loop: asyncio.AbstractEventLoop | None = None,
+        errors: list[Exception] | None = None,
+    ) -> tuple[list[Any], list[tuple[int | list[int] | None, Any]]]:
+        # returns results of all called listeners in registration order and pairs of result indices and awaitables
+        # or futures whose results are yet to be resolved, with indices being a list for calls made in order by
+        # executors and None for awaitables of error events
+        results: list[Any] = []
+        unresolved: list[tuple[int | list[int] | None, Any]] = []
+        pending: list[Any] = []
+        ordered_calls: dict[concurrent.futures.Executor, list[tuple[Callable[..., Any], tuple, dict]]] = {}
+        ordered_indices: dict[concurrent.futures.Executor, list[int]] = {}
         for listener in listeners:
-            # since listeners can emit events themselves,
-            # deregister them before calling if needed
-            if listener.ttl == 1:
-                self.off(listener.event, func=listener.func)
+            # skip listeners that expired in the meantime
+            if listener.ttl == 0:
+                continue
+
+            n = len(pending)
+            call_args, call_kwargs = (([(args, kwargs)],), {}) if listener.batch else (args, kwargs)
+            res = self._call_listener(listener, call_args, call_kwargs, loop, pending, ordered_calls, event, errors)
+            if res is skipped:
+                continue
+
+            # remember where to put results of awaitables, futures and calls queued for ordered executors
+            executor = listener.executor or (self.executor if listener.kind == Listener.SYNC else None)
+            if self.ordered and executor is not None:
+                indices = ordered_indices.setdefault(executor, [])
+                if len(ordered_calls.get(executor, ())) > len(indices):
+                    indices.append(len(results))
+            elif len(pending) > n and (listener.kind != Listener.SYNC or executor is not None):
+                unresolved.append((len(results), pending[n]))
+                n += 1
+            unresolved.extend((None, obj) for obj in pending[n:])
+            results.append(res)
+
+        # calls queued per executor return lists of results in order
+        for executor, calls in ordered_calls.items():
+            unresolved.append((ordered_indices[executor], self._submit(executor, loop, call_in_order, (calls,), {})))
+
+        return results, unresolved
+
+    @classmethod
+    def _fill_results(
+        cls,
+        results: list[Any],
+        unresolved: list[tuple[int | list[int] | None, Any]],
+        values: list[Any],
+    ) -> list[Any]:
+        # insert resolved values of awaitables and futures into results
+        for (index, _), value in zip(unresolved, values):
+            if isinstance(index, int):
+                results[index] = value
+            elif index is not None:
+                for _index, _value in zip(index, value or ()):
+                    results[_index] = _value
+        return results
+
+    def _resolve(self, awaitables: list[Any]) -> list[Any]:
+        # waits for awaitables and futures, returning their results in the same order
+        if not awaitables:
+            return []
+
+        # only futures from executors
+        if all(isinstance(obj, concurrent.futures.Future) for obj in awaitables):
+            return [future.result() for future in awaitables]
+
+        # awaitables
+        if self.runner is not None:
+            if self.runner.in_loop_thread():
+                for obj in awaitables:
+                    if inspect.iscoroutine(obj):
+                        obj.close()
+                raise RuntimeError("cannot wait for results of async functions within the loop of the runner")
+            return self.runner.submit(awaitables).result()
+
+        async def start() -> list[Any]:
+            return await asyncio.gather(*map(as_awaitable, awaitables))
+
+        return asyncio.run(start())
+
+    def _handle_pending(self, pending: list[Any]) -> list[concurrent.futures.Future]:
+        # run awaitables to completion and return futures from executors
+        if not pending:
+            return []
+
+        # separate futures from executors
+        futures = [obj for obj in pending if isinstance(obj, concurrent.futures.Future)]
+        awaitables = [obj for obj in pending if not isinstance(obj, concurrent.futures.Future)]
+
+        # handle awaitables
+        if not awaitables:
+            pass
+        elif self.runner is not None:
+            if self.runner.in_loop_thread():
+                self.runner.schedule(awaitables)
+            else:
+                self.runner.submit(awaitables).result()
+        else:
+
+            async def start() -> None:
+                await asyncio.gather(*awaitables)
 
-            res = listener(*args, **kwargs)
-            if listener.is_coroutine or listener.is_async_callable:
-                awaitables.append(res)
+            asyncio.run(start())
+
+        return futures
 
-        return awaitables
+    @classmethod
+    def _batch_items(
+        cls,
+        items: Iterable[tuple[str, tuple[Any, ...]] | tuple[str, tuple[Any, ...], dict[str, Any]]],
+    ) -> Iterator[tuple[str, tuple[Any, ...], dict[str, Any]]]:
+        # normalize items passed to emit_batch
+        for item in items:
+            if len(item) == 2:
+                yield (item[0], item[1], {})  # type: ignore[misc]
+            else:
+                yield item  # type: ignore[misc]
 
-    def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> list[concurrent.futures.Future]:
         """
         Emits an *event*. All functions of events that match *event* are invoked with *args* and *kwargs* in the exact
         order of their registration, with the exception of async functions that are invoked in a separate event loop.
+
+        When a :py:attr:`runner` is set, async functions are invoked in its event loop and this method blocks until
+        they are done. When called from within that loop, e.g. by an async function itself, they are only scheduled.
+
+        Functions dispatched to executors are not waited for. Instead, a list of their
+        :py:class:`concurrent.futures.Future` objects is returned.
         """
         # emit normal functions and get awaitables of async ones
-        awaitables = self._emit(event, *args, **kwargs)
+        errors = self._new_errors()
+        pending = self._emit(event, args, kwargs, errors=errors)
+        futures = self._handle_pending(pending)
+        self._raise_errors(errors, event)
 
-        # handle awaitables
-        if awaitables:
+        return futures
 
-            async def start() -> None:
-                await asyncio.gather(*awaitables)
+    def emit_many(
+        self,
+        event: str,
+        args_list: Iterable[tuple[Any, ...]],
+        **kwargs: Any,
+    ) -> list[concurrent.futures.Future]:
+        """
+        Emits an *event* once per tuple of positional arguments in *args_list*, with *kwargs* being passed to all
+        invocations. Functions are resolved only once and invoked in the order of their registration for each tuple of
+        arguments, as if :py:meth:`emit` was called repeatedly. Functions registered with ``batch=True`` are invoked
+        only once with a list of ``(args, kwargs)`` pairs. Async functions and executors are handled as in
+        :py:meth:`emit`.
+        """
+        # emit normal functions and get awaitables of async ones
+        errors = self._new_errors()
+        pending = self._emit_many(((event, args, kwargs) for args in args_list), errors=errors)
+        futures = self._handle_pending(pending)
+        self._raise_errors(errors, event)
 
-            asyncio.run(start())
+        return futures
+
+    def emit_batch(
+        self,
+        items: Iterable[tuple[str, tuple[Any, ...]] | tuple[str, tuple[Any, ...], dict[str, Any]]],
+    ) -> list[concurrent.futures.Future]:
+        """
+        Emits multiple events given by *items* in the form ``(event, args)`` or ``(event, args, kwargs)``, resolving
+        functions once per distinct event name. See :py:meth:`emit_many` for more info.
+        """
+        # emit normal functions and get awaitables of async ones
+        errors = self._new_errors()
+        pending = self._emit_many(self._batch_items(items), errors=errors)
+        futures = self._handle_pending(pending)
+        self._raise_errors(errors, "batch")
+
+        return futures
+
+    def event(self, event: str) -> EventHandle:
+        """
+        Returns an :py:class:`EventHandle` of *event* whose functions are resolved only once and again only after
+        functions were added or removed, which is the fastest way to repeatedly emit the same event.
+        """
+        return EventHandle(self, event)
+
+    def namespace(self, namespace: str) -> Namespace:
+        """
+        Returns a :py:class:`Namespace` view on all events whose names start with *namespace* followed by the
+        *delimiter*.
+        """
+        return Namespace(self, namespace)
+
+    def queue(self, **kwargs: Any) -> EventQueue:
+        """
+        Returns a new :py:class:`EventQueue` for this emitter, forwarding all *kwargs* to its constructor.
+        """
+        return EventQueue(self, **kwargs)
+
+    def emit_threadsafe(self, event: str, *args: Any, **kwargs: Any) -> concurrent.futures.Future:
+        """
+        Non-blocking version of :py:meth:`emit` that requires a :py:attr:`runner`. Async functions are submitted to the
+        event loop of the runner and a :py:class:`concurrent.futures.Future` is returned that resolves once all of them,
+        as well as functions dispatched to executors, are done.
+        """
+        if self.runner is None:
+            raise RuntimeError("emit_threadsafe requires the emitter to have a runner")
+
+        # emit normal functions and get awaitables of async ones
+        pending = self._emit(event, args, kwargs)
+
+        return self.runner.submit(pending)
 
     async def emit_async(self, event: str, *args: Any, **kwargs: Any) -> None:
         """
         Awaitable version of :py:meth:`emit`. However, this method does not start a new event loop but uses the existing
-        one.
+        one. Functions dispatched to executors are awaited as well using :py:meth:`asyncio.loop.run_in_executor`.
         """
         # emit normal functions and get awaitables of async ones
-        awaitables = self._emit(event, *args, **kwargs)
+        errors = self._new_errors()
+        awaitables = self._emit(event, args, kwargs, loop=asyncio.get_running_loop(), errors=errors)
 
         # handle awaitables
         if awaitables:
             await asyncio.gather(*awaitables)
+        self._raise_errors(errors, event)
 
-    def emit_future(self, event: str, *args: Any, **kwargs: Any) -> None:
+    async def emit_many_async(self, event: str, args_list: Iterable[tuple[Any, ...]], **kwargs: Any) -> None:
         """
-        Deferred version of :py:meth:`emit` with all awaitable events being places at the end of the existing event loop
-        (using :py:func:`asyncio.ensure_future`).
+        Awaitable version of :py:meth:`emit_many`, using the existing event loop as :py:meth:`emit_async`.
         """
         # emit normal functions and get awaitables of async ones
-        awaitables = self._emit(event, *args, **kwargs)
+        errors = self._new_errors()
+        loop = asyncio.get_running_loop()
+        awaitables = self._emit_many(((event, args, kwargs) for args in args_list), loop=loop, errors=errors)
 
         # handle awaitables
         if awaitables:
-            asyncio.ensure_future(asyncio.gather(*awaitables))  # noqa: RUF006
+            await asyncio.gather(*awaitables)
+        self._raise_errors(errors, event)
 
+    async def emit_batch_async(
+        self,
+        items: Iterable[tuple[str, tuple[Any, ...]] | tuple[str, tuple[Any, ...], dict[str, Any]]],
+    ) -> None:
+        """
+        Awaitable version of :py:meth:`emit_batch`, using the existing event loop as :py:meth:`emit_async`.
+        """
+        # emit normal functions and get awaitables of async ones
+        errors = self._new_errors()
+        awaitables = self._emit_many(self._batch_items(items), loop=asyncio.get_running_loop(), errors=errors)
 
-class BaseNode:
-    def __init__(self, wildcard: bool, delimiter: str) -> None:
-        self.wildcard = wildcard
-        self.delimiter = delimiter
-        self.parent: BaseNode | None = None
-        self.nodes: dict[str, Node] = {}
+        # handle awaitables
+        if awaitables:
+            await asyncio.gather(*awaitables)
+        self._raise_errors(errors, "batch")
 
-    def clear(self) -> None:
-        self.nodes.clear()
+    def emit_future(self, event: str, *args: Any, **kwargs: Any) -> None:
+        """
+        Deferred version of :py:meth:`emit` with all awaitable events being places at the end of the existing event loop
+        (using :py:func:`asyncio.ensure_future`), including futures of functions dispatched to executors.
+        """
+        # emit normal functions and get awaitables of async ones
+        pending = self._emit(event, args, kwargs)
 
-    def add_node(self, node: Node) -> Node:
-        # when there is a node with the exact same name (pattern), merge listeners
-        if node.name in self.nodes:
-            _node = self.nodes[node.name]
-            _node.listeners.extend(node.listeners)
-            return _node
+        # handle awaitables
+        if pending:
+            asyncio.ensure_future(asyncio.gather(*map(as_awaitable, pending)))  # noqa: RUF006
 
-        # otherwise add it and set its parent
-        self.nodes[node.name] = node
-        node.parent = self
+    def emit_collect(self, event: str, *args: Any, **kwargs: Any) -> list[Any]:
+        """
+        Emits an *event* as :py:meth:`emit` and returns the results of all invoked functions in the order of their
+        registration. Async functions are awaited concurrently, and functions dispatched to executors are waited for.
+        When functions raise exceptions that are not raised according to the :py:attr:`error_policy`, their results
+        are *None*.
+        """
+        errors = self._new_errors()
+        results, unresolved = self._emit_collect(event, self._find_listeners(event), args, kwargs, errors=errors)
+        values = self._resolve([obj for _, obj in unresolved])
+        self._raise_errors(errors, event)
 
-        return node
+        return self._fill_results(results, unresolved, values)
 
-    def walk_nodes(self) -> Iterator[tuple[str, tuple[str, ...], list[str]]]:
-        queue = [(name, [name], node) for name, node in self.nodes.items()]
-        while queue:
-            name, path, node = queue.pop(0)
+    async def emit_async_collect(self, event: str, *args: Any, **kwargs: Any) -> list[Any]:
+        """
+        Awaitable version of :py:meth:`emit_collect`, using the existing event loop as :py:meth:`emit_async`.
+        """
+        errors = self._new_errors()
+        loop = asyncio.get_running_loop()
+        results, unresolved = self._emit_collect(event, self._find_listeners(event), args, kwargs, loop, errors)
+        values = await asyncio.gather(*[obj for _, obj in unresolved])
+        self._raise_errors(errors, event)
 
-            # get names of child names
-            child_names = list(node.nodes)
+        return self._fill_results(results, unresolved, values)
 
-            # yield the name, the path leading to the node and names of child nodes that can be
-            # adjusted in place by the outer context to change the traversal (similar to os.walk)
-            yield (name, tuple(path), child_names)
+    def emit_until(self, event: str, predicate: Callable[[Any], bool], *args: Any, **kwargs: Any) -> Any:
+        """
+        Emits an *event*, invoking functions one after another in the order of their registration until *predicate*
+        returns *True* for the result of a function, which is then returned. Remaining functions are not invoked.
+        Results of async functions and of functions dispatched to executors are waited for before deciding whether to
+        continue. *None* is returned when no result satisfies *predicate*.
+        """
+        errors = self._new_errors()
+        for listener in self._find_listeners(event):
+            results, unresolved = self._emit_collect(event, (listener,), args, kwargs, errors=errors)
+            values = self._resolve([obj for _, obj in unresolved])
+            if self._fill_results(results, unresolved, values) and predicate(results[0]):
+                self._raise_errors(errors, event)
+                return results[0]
+
+        self._raise_errors(errors, event)
+        return None
+
+    async def emit_until_async(
+        self,
+        event: str,
+        predicate: Callable[[Any], bool],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Awaitable version of :py:meth:`emit_until`, using the existing event loop as :py:meth:`emit_async`.
+        """
+        errors = self._new_errors()
+        loop = asyncio.get_running_loop()
+        for listener in self._find_listeners(event):
+            results, unresolved = self._emit_collect(event, (listener,), args, kwargs, loop, errors)
+            values = await asyncio.gather(*[obj for _, obj in unresolved])
+            if self._fill_results(results, unresolved, values) and predicate(results[0]):
+                self._raise_errors(errors, event)
+                return results[0]
+
+        self._raise_errors(errors, event)
+        return None
+
+    def emit_first(self, event: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Shorthand for :py:meth:`emit_until` returning the first result that is not *None*.
+        """
+        return self.emit_until(event, is_not_none, *args, **kwargs)
 
-            # add remaining child nodes
-            queue.extend([(child_name, [*path, child_name], node.nodes[child_name]) for child_name in child_names])
+    async def emit_first_async(self, event: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Shorthand for :py:meth:`emit_until_async` returning the first result that is not *None*.
+        """
+        return await self.emit_until_async(event, is_not_none, *args, **kwargs)
+
+
+class ThreadSafeEventEmitter(EventEmitter):
+    """
+    An :py:class:`EventEmitter` that can be shared between threads. All *kwargs* are forwarded to
+    :py:class:`EventEmitter`.
+
+    Registering and removing listeners is serialized by a lock, after which the resolved listeners per emitted event
+    name are published as an immutable snapshot of the dispatch cache. Emitting threads read listeners from the
+    current snapshot without locking, and only take the lock to resolve event names that are not cached yet. As each
+    emit works on the snapshot it started with, listeners removed concurrently might still be invoked by emits that
+    are already in progress. Since snapshot reads do not update the recency of cache entries, cached event names are
+    evicted in the order they were first emitted.
+
+    As snapshots are never changed, emitting threads do not contend for shared mutable state, which allows emits to
+    scale with the number of threads on free-threaded Python builds.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+
+        # reentrant lock protecting the tree, the any listeners and the dispatch cache
+        self._lock = threading.RLock()
+
+        # immutable copy of the dispatch cache that is replaced, but never changed, after each modification
+        self._snapshot: dict[str, tuple[Listener, ...]] = {}
+
+    def _publish(self) -> None:
+        # must be called with the lock acquired
+        self._snapshot = dict(self._dispatch_cache)
+
+    def set_max_listeners(self, n: int, event: str | None = None) -> None:
+        with self._lock:
+            super().set_max_listeners(n, event=event)
+
+    @overload
+    def off(self, event: str, func: F) -> F: ...
+
+    @overload
+    def off(self, event: str) -> Callable[[F], F]: ...
+
+    def off(self, event: str, func: Callable[..., Any] | None = None) -> Any:
+        with self._lock:
+            if func is None:
+                return super().off(event)
+            return super().off(event, func)
+
+    def off_all(self) -> None:
+        with self._lock:
+            super().off_all()
+            self._publish()
+
+    def compact(self) -> int:
+        with self._lock:
+            return super().compact()
+
+    def listeners(self, event: str) -> list[Callable[..., Any]]:
+        with self._lock:
+            return super().listeners(event)
+
+    def listeners_any(self) -> list[Callable[..., Any]]:
+        with self._lock:
+            return super().listeners_any()
+
+    def listeners_all(self) -> list[Callable[..., Any]]:
+        with self._lock:
+            return super().listeners_all()
+
+    def _add_listener(self, event: str, listener: Listener) -> bool:
+        with self._lock:
+            return super()._add_listener(event, listener)
+
+    def _add_any_listener(self, listener: Listener) -> bool:
+        with self._lock:
+            return super()._add_any_listener(listener)
+
+    def _remove_any_listeners(self, func: Callable[..., Any]) -> None:
+        with self._lock:
+            super()._remove_any_listeners(func)
+
+    def _remove_listener(self, listener: Listener) -> bool:
+        with self._lock:
+            return super()._remove_listener(listener)
+
+    def _invalidate_cache(self, event: str) -> None:
+        super()._invalidate_cache(event)
+        self._publish()
+
+    def _invalidate_cache_any(self) -> None:
+        super()._invalidate_cache_any()
+        self._publish()
+
+    def _find_listeners(self, event: str) -> tuple[Listener, ...]:
+        # lock-free snapshot lookup
+        listeners = self._snapshot.get(event)
+        if listeners is not None:
+            return listeners
+
+        # resolve and publish
+        with self._lock:
+            listeners = super()._find_listeners(event)
+            if self.cache_size != 0:
+                self._publish()
+
+        return listeners
+
+
+# base class of EmitError, being a minimal replacement of ExceptionGroup before python 3.11
+if sys.version_info >= (3, 11):
+    _ExceptionGroup = ExceptionGroup  # noqa: F821
+else:
+
+    class _ExceptionGroup(Exception):
+        def __init__(self, message: str, exceptions: Iterable[Exception]) -> None:
+            exceptions = tuple(exceptions)
+            super().__init__(message, exceptions)
+            self.message = message
+            self.exceptions = exceptions
+
+        def __str__(self) -> str:
+            return f"{self.message} ({len(self.exceptions)} sub-exception(s))"
+
+
+class EmitError(_ExceptionGroup):  # type: ignore[misc, valid-type]
+    """
+    Group of exceptions raised by listeners during an emit with the ``"collect"`` error policy, which is an
+    :py:class:`ExceptionGroup` on Python 3.11 and above. The exceptions are available as :py:attr:`exceptions`.
+    """
+
+
+# result of listeners that were not called
+skipped: Any = object()
+
+
+def is_not_none(obj: Any) -> bool:
+    return obj is not None
+
+
+def call_in_order(calls: list[tuple[Callable[..., Any], tuple[Any, ...], dict[str, Any]]]) -> list[Any]:
+    """
+    Makes all *calls*, given as ``(func, args, kwargs)``, one after another and returns their results.
+    """
+    return [func(*args, **kwargs) for func, args, kwargs in calls]
+
+
+def merge_listeners(*listeners: Iterable[Listener]) -> list[Listener]:
+    """
+    Merges multiple collections of *listeners* that are each ordered by registration into a single ordered list.
+    """
+    non_empty = [_listeners for _listeners in listeners if _listeners]
+    if not non_empty:
+        return []
+    if len(non_empty) == 1:
+        return list(non_empty[0])
+    return list(heapq.merge(*non_empty, key=operator.attrgetter("seq")))
+
+
+def as_awaitable(obj: Awaitable | concurrent.futures.Future) -> Awaitable:
+    """
+    Returns *obj* as is if already awaitable, or wraps it into an asyncio future when it is a
+    :py:class:`concurrent.futures.Future`.
+    """
+    return asyncio.wrap_future(obj) if isinstance(obj, concurrent.futures.Future) else obj
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Returns a compiled regular expression for a wildcard *pattern* following the :py:mod:`fnmatch` syntax.
+    """
+    return re.compile(fnmatch.translate(pattern))
+
+
+class BaseNode:
+    __slots__ = ("count", "nodes", "parent", "pattern_nodes", "tree")
+
+    # configuration shared by all nodes of a tree
+    wildcard: bool
+    delimiter: str
+
+    def __init__(self, tree: Tree | None = None) -> None:
+        self.tree: Tree = self if tree is None else tree  # type: ignore[assignment]
+        self.parent: BaseNode | None = None
+        self.nodes: dict[str, Node] = empty_mapping  # type: ignore[assignment]
+
+        # subset of child nodes whose names are patterns, only filled in wildcard mode
+        self.pattern_nodes: dict[str, Node] = empty_mapping  # type: ignore[assignment]
+
+        # number of listeners of this node and all its descendants, updated incrementally
+        self.count = 0
+
+    def update_count(self, n: int) -> None:
+        # propagate a change of the number of listeners to this node and all its ancestors
+        node: BaseNode | None = self
+        while node is not None:
+            node.count += n
+            node = node.parent
+
+    def clear(self) -> None:
+        # detach all listeners recursively
+        for node in self.nodes.values():
+            node.clear()
+
+        self.nodes = empty_mapping  # type: ignore[assignment]
+        self.pattern_nodes = empty_mapping  # type: ignore[assignment]
+
+    def add_node(self, node: Node) -> Node:
+        # when there is a node with the exact same name (pattern), merge listeners
+        if node.name in self.nodes:
+            _node = self.nodes[node.name]
+            listeners = merge_listeners(_node.listeners, node.listeners)  # type: ignore[arg-type]
+            _node.clear_listeners()
+            for listener in listeners:
+                _node.add_listener(listener)
+            return _node
+
+        # otherwise add it and set its parent
+        if not self.nodes:
+            self.nodes = {}
+        self.nodes[node.name] = node
+        if node.regex is not None:
+            if not self.pattern_nodes:
+                self.pattern_nodes = {}
+            self.pattern_nodes[node.name] = node
+        node.parent = self
+        if node.count:
+            self.update_count(node.count)
+
+        return node
+
+    def remove_node(self, node: Node) -> None:
+        # detach a child node, which must not contain any listeners
+        del self.nodes[node.name]
+        if not self.nodes:
+            self.nodes = empty_mapping  # type: ignore[assignment]
+        if node.regex is not None:
+            del self.pattern_nodes[node.name]
+            if not self.pattern_nodes:
+                self.pattern_nodes = empty_mapping  # type: ignore[assignment]
+        node.parent = None
+
+    def match_nodes(self, name: str) -> list[Node]:
+        # literal names are looked up directly and only compared to child nodes whose names are patterns
+        if Node.str_is_pattern(name) and self.wildcard:
+            regex = compile_pattern(name)
+            return [node for node_name, node in self.nodes.items() if regex.match(node_name)]
+
+        node = self.nodes.get(name)
+        nodes = [] if node is None else [node]
+        if self.pattern_nodes:
+            nodes.extend(node for node in self.pattern_nodes.values() if node.regex.match(name))  # type: ignore[union-attr]
+
+        return nodes
+
+    def find_sub_nodes(self, names: list[str], globstar: bool | None = None) -> list[Node]:
+        # match names level by level, starting with child nodes
+        nodes: list[BaseNode] = [self]
+
+        # fast path without "**" semantics, which is the default when not in wildcard mode
+        if not (self.wildcard if globstar is None else globstar):
+            for name in names:
+                nodes = [child for node in nodes for child in node.match_nodes(name)]
+                if not nodes:
+                    break
+            return nodes  # type: ignore[return-value]
+
+        expanded = False
+        for name in names:
+            # "**" nodes matching zero names are added to the current level, an emitted "**" matches all
+            # nodes below the current level which then match the next name themselves
+            nodes, _expanded = self._expand_globstar(nodes, name == Node.globstar)
+            expanded |= _expanded
+            if name == Node.globstar:
+                continue
+
+            next_nodes = [child for node in nodes for child in node.match_nodes(name)]
+            if expanded:
+                # "**" nodes can match any number of names, so keep them
+                next_nodes.extend(node for node in nodes if isinstance(node, Node) and node.is_globstar)
+                next_nodes = list(dict.fromkeys(next_nodes))
+            nodes = next_nodes  # type: ignore[assignment]
+            if not nodes:
+                break
+
+        if nodes:
+            nodes, _ = self._expand_globstar(nodes, False)
+
+        return [node for node in nodes if isinstance(node, Node)]
+
+    @classmethod
+    def _expand_globstar(cls, nodes: list[BaseNode], descend: bool) -> tuple[list[BaseNode], bool]:
+        # adds "**" child nodes recursively, or all child nodes when descend is True
+        if not descend:
+            for node in nodes:
+                if Node.globstar in node.nodes:
+                    break
+            else:
+                return (nodes, False)
+
+        expanded = dict.fromkeys(nodes)
+        queue = list(nodes)
+        while queue:
+            node = queue.pop()
+            children = node.nodes.values() if descend else [node.nodes.get(Node.globstar)]
+            for child in children:
+                if child is not None and child not in expanded:
+                    expanded[child] = None
+                    queue.append(child)
+
+        return (list(expanded), len(expanded) != len(nodes))
+
+    def walk_nodes(self) -> Iterator[tuple[str, tuple[str, ...], list[str]]]:
+        queue = [(name, [name], node) for name, node in self.nodes.items()]
+        while queue:
+            name, path, node = queue.pop(0)
+
+            # get names of child names
+            child_names = list(node.nodes)
+
+            # yield the name, the path leading to the node and names of child nodes that can be
+            # adjusted in place by the outer context to change the traversal (similar to os.walk)
+            yield (name, tuple(path), child_names)
+
+            # add remaining child nodes
+            queue.extend([(child_name, [*path, child_name], node.nodes[child_name]) for child_name in child_names])
 
 
 class Node(BaseNode):
@@ -312,38 +1666,89 @@ class Node(BaseNode):
     Actual named nodes containing listeners.
     """
 
+    __slots__ = ("is_globstar", "listeners", "name", "regex")
+
+    globstar = "**"
+
     @classmethod
     def str_is_pattern(cls, s: str) -> bool:
         return "*" in s or "?" in s
 
-    def __init__(self, name: str, *args: Any) -> None:
-        super().__init__(*args)
+    def __init__(self, name: str, tree: Tree) -> None:
+        super().__init__(tree)
 
         self.name = name
-        self.listeners: list[Listener] = []
+        # ordered mapping of listeners for removal in constant time
+        self.listeners: dict[Listener, None] = empty_mapping  # type: ignore[assignment]
+
+        # compiled pattern when the name contains wildcards
+        self.regex = compile_pattern(name) if tree.wildcard and self.str_is_pattern(name) else None
+        self.is_globstar = tree.wildcard and name == self.globstar
+
+    @property
+    def wildcard(self) -> bool:  # type: ignore[override]
+        return self.tree.wildcard
+
+    @property
+    def delimiter(self) -> str:  # type: ignore[override]
+        return self.tree.delimiter
+
+    @property
+    def path(self) -> str:
+        # full event name of this node
+        names = [self.name]
+        node = self.parent
+        while isinstance(node, Node):
+            names.append(node.name)
+            node = node.parent
+        return self.delimiter.join(reversed(names))
 
     def num_listeners(self, recursive: bool = True) -> int:
-        n = len(self.listeners)
+        return self.count if recursive else len(self.listeners)
 
-        if recursive:
-            n += sum(node.num_listeners(recursive=recursive) for node in self.nodes.values())
+    def clear(self) -> None:
+        super().clear()
+        self.clear_listeners()
 
-        return n
+    def clear_listeners(self) -> None:
+        if self.listeners:
+            self.update_count(-len(self.listeners))
+            self.listeners = empty_mapping  # type: ignore[assignment]
 
     def remove_listeners_by_func(self, func: Callable[..., Any]) -> None:
-        self.listeners[:] = [listener for listener in self.listeners if listener.func != func]
+        for listener in [listener for listener in self.listeners if listener.func == func]:
+            self.remove_listener(listener)
+
+    def remove_listener(self, listener: Listener) -> bool:
+        if listener not in self.listeners:
+            return False
+
+        del self.listeners[listener]
+        if not self.listeners:
+            self.listeners = empty_mapping  # type: ignore[assignment]
+        self.update_count(-1)
+
+        return True
 
     def add_listener(self, listener: Listener) -> None:
-        self.listeners.append(listener)
+        if not self.listeners:
+            self.listeners = {}
+        self.listeners[listener] = None
+        self.update_count(1)
+        listener.node = self
 
-    def check_name(self, pattern: str) -> bool:
-        if self.wildcard:
-            if self.str_is_pattern(pattern):
-                return fnmatch.fnmatch(self.name, pattern)
-            if self.str_is_pattern(self.name):
-                return fnmatch.fnmatch(pattern, self.name)
+    @classmethod
+    def match_name(cls, name: str, pattern: str, wildcard: bool) -> bool:
+        if wildcard:
+            if cls.str_is_pattern(pattern):
+                return compile_pattern(pattern).match(name) is not None
+            if cls.str_is_pattern(name):
+                return compile_pattern(name).match(pattern) is not None
+
+        return name == pattern
 
-        return self.name == pattern
+    def check_name(self, pattern: str) -> bool:
+        return self.match_name(self.name, pattern, self.wildcard)
 
     def find_nodes(self, event: str | list[str]) -> list[Node]:
         # trivial case
@@ -364,20 +1769,86 @@ class Node(BaseNode):
         if not sub_patterns:
             return [self]
 
-        # recursively match sub names with nodes
-        return sum((node.find_nodes(sub_patterns) for node in self.nodes.values()), [])
+        # match sub names with nodes
+        return self.find_sub_nodes(sub_patterns)
 
 
 class Tree(BaseNode):
     """
-    Top-level node without a name or listeners, but providing higher-level node access.
+    Top-level node without a name or listeners, but providing higher-level node access and the configuration shared
+    by all nodes.
     """
 
+    __slots__ = ("delimiter", "has_globstar", "wildcard")
+
+    def __init__(self, wildcard: bool, delimiter: str) -> None:
+        super().__init__()
+
+        self.wildcard = wildcard
+        self.delimiter = delimiter
+
+        # whether "**" nodes were added, requiring multi-level matching during lookup
+        self.has_globstar = False
+
+    def clear(self) -> None:
+        super().clear()
+        self.has_globstar = False
+
     def num_listeners(self) -> int:
-        return sum(node.num_listeners(recursive=True) for node in self.nodes.values())
+        return self.count
+
+    def prune(self, node: Node) -> int:
+        # remove the node and its ancestors up to the first one that still contains listeners, returns their number
+        n = 0
+        current: BaseNode = node
+        while isinstance(current, Node) and not current.count and current.parent is not None:
+            parent = current.parent
+            parent.remove_node(current)
+            current = parent
+            n += 1
+
+        # without any listeners left, lookups no longer need to consider "**" nodes
+        if not self.count:
+            self.has_globstar = False
 
-    def find_nodes(self, *args: Any, **kwargs: Any) -> list[Node]:
-        return sum((node.find_nodes(*args, **kwargs) for node in self.nodes.values()), [])
+        return n
+
+    def prune_all(self) -> int:
+        # remove all empty branches, returns the number of removed nodes
+        n = 0
+        nodes: list[BaseNode] = [self]
+        while nodes:
+            node = nodes.pop()
+            for child in list(node.nodes.values()):
+                if child.count:
+                    nodes.append(child)
+                else:
+                    n += 1 + sum(1 for _ in child.walk_nodes())
+                    node.remove_node(child)
+
+        if not self.count:
+            self.has_globstar = False
+
+        return n
+
+    def get_node(self, event: str) -> Node | None:
+        # returns the node registered to exactly *event* without evaluating wildcards
+        node: BaseNode | None = self
+        for name in event.split(self.delimiter):
+            node = node.nodes.get(name)  # type: ignore[union-attr]
+            if node is None:
+                return None
+        return node  # type: ignore[return-value]
+
+    def find_nodes(self, event: str | list[str]) -> list[Node]:
+        # trivial case
+        if not event:
+            return []
+
+        names = event.split(self.delimiter) if isinstance(event, str) else event
+        globstar = self.wildcard and (self.has_globstar or Node.globstar in names)
+
+        return self.find_sub_nodes(names, globstar=globstar)
 
     def add_listener(self, event: str, listener: Listener) -> None:
         # add nodes without evaluating wildcards, this is done during node lookup only
@@ -390,63 +1861,769 @@ class Tree(BaseNode):
             if name in node.nodes:
                 node = node.nodes[name]  # type: ignore[assignment]
             else:
-                new_node = Node(name, self.wildcard, self.delimiter)
+                new_node = Node(name, self)
                 node.add_node(new_node)
                 node = new_node  # type: ignore[assignment]
+                self.has_globstar |= new_node.is_globstar
 
         # add the listeners
         node.add_listener(listener)  # type: ignore[arg-type, call-arg]
 
-    def remove_listeners_by_func(self, event: str, func: Callable[..., Any]) -> None:
+    def match(self, event: str, path: str) -> bool:
+        # whether an emitted event reaches listeners registered to the event at path
+        if not self.wildcard:
+            return event == path
+
+        patterns = event.split(self.delimiter)
+        names = path.split(self.delimiter)
+        if Node.globstar not in patterns and Node.globstar not in names:
+            if len(patterns) != len(names):
+                return False
+            return all(Node.match_name(name, pattern, True) for name, pattern in zip(names, patterns))
+
+        # "**" on either side matches any number of names on the other side, so traverse index pairs
+        queue = [(0, 0)]
+        seen = set()
+        while queue:
+            i, j = queue.pop()
+            if (i, j) in seen:
+                continue
+            seen.add((i, j))
+            if i == len(patterns) and j == len(names):
+                return True
+            if i < len(patterns) and patterns[i] == Node.globstar:
+                queue.append((i + 1, j))
+                if j < len(names):
+                    queue.append((i, j + 1))
+            elif j < len(names) and names[j] == Node.globstar:
+                queue.append((i, j + 1))
+                if i < len(patterns):
+                    queue.append((i + 1, j))
+            elif i < len(patterns) and j < len(names) and Node.match_name(names[j], patterns[i], True):
+                queue.append((i + 1, j + 1))
+
+        return False
+
+    def remove_listeners_by_func(self, event: str, func: Callable[..., Any]) -> list[Node]:
+        # returns the nodes whose listeners changed
+        nodes = []
         for node in self.find_nodes(event):
+            n = len(node.listeners)
             node.remove_listeners_by_func(func)
+            if len(node.listeners) != n:
+                nodes.append(node)
+        return nodes
 
-    def remove_listeners_by_event(self, event: str) -> None:
+    def remove_listeners_by_event(self, event: str) -> list[Node]:
+        # returns the nodes whose listeners changed
+        nodes = []
         for node in self.find_nodes(event):
-            node.listeners.clear()
+            if node.listeners:
+                node.clear_listeners()
+                nodes.append(node)
+        return nodes
 
     def find_listeners(self, event: str, sort: bool = True) -> list[Listener]:
-        listeners: list[Listener] = sum((node.listeners for node in self.find_nodes(event)), [])
-
-        # sort by registration time
+        # listeners of each node are ordered by registration, so merge them if requested
+        nodes = self.find_nodes(event)
         if sort:
-            listeners = sorted(listeners, key=lambda listener: listener.time)
+            return merge_listeners(*(node.listeners for node in nodes))
 
-        return listeners
+        return [listener for node in nodes for listener in node.listeners]
 
 
 class Listener:
     """
     A simple event listener class that wraps a function *func* for a specific *event* and that keeps track of the times
     to listen left.
+
+    The kind of *func* is determined once on construction and stored in :py:attr:`kind`, being one of
+    :py:attr:`SYNC`, :py:attr:`COROUTINE` (a coroutine function) or :py:attr:`ASYNC_CALLABLE` (an object whose
+    ``__call__`` method is a coroutine function). Synchronous functions can be configured to be dispatched to an
+    *executor*. When *batch* is *True*, the function expects a list of ``(args, kwargs)`` pairs.
+
+    Decreasing a non-negative ttl is guarded by a lock per listener, so that the function is invoked exactly ttl times
+    even when called from multiple threads at once, including free-threaded builds without the GIL.
     """
 
-    def __init__(self, func: Callable[..., Any], event: str, ttl: int) -> None:
+    __slots__ = ("__weakref__", "batch", "event", "executor", "func", "kind", "lock", "node", "seq", "time", "ttl")
+
+    _seq = itertools.count()
+
+    SYNC = 0
+    COROUTINE = 1
+    ASYNC_CALLABLE = 2
+
+    @classmethod
+    def get_kind(cls, func: Callable[..., Any]) -> int:
+        if asyncio.iscoroutinefunction(func):
+            return cls.COROUTINE
+        if asyncio.iscoroutinefunction(getattr(func, "__call__", None)):  # noqa: B004
+            return cls.ASYNC_CALLABLE
+        return cls.SYNC
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        event: str,
+        ttl: int,
+        *,
+        executor: concurrent.futures.Executor | None = None,
+        batch: bool = False,
+    ) -> None:
         self.func = func
         self.event = event
         self.ttl = ttl
+        self.kind = self.get_kind(func)
+        self.executor = executor
+        self.batch = batch
+
+        # node the listener is added to, or None for "any" listeners
+        self.node: Node | None = None
+
+        # lock for decreasing the ttl, not needed when listening infinitely
+        self.lock = threading.Lock() if ttl >= 0 else None
 
-        # store the registration time
+        # only synchronous functions can be dispatched to executors
+        if executor is not None and self.kind != self.SYNC:
+            raise ValueError(f"cannot dispatch async function {func!r} to executor {executor!r}")
+
+        # store the registration time and a sequence number defining the order of registration
         self.time = time.monotonic()
+        self.seq = next(self._seq)
 
     @property
     def is_coroutine(self) -> bool:
-        return asyncio.iscoroutinefunction(self.func)
+        return self.kind == self.COROUTINE
 
     @property
     def is_async_callable(self) -> bool:
-        return asyncio.iscoroutinefunction(getattr(self.func, "__call__", None))  # noqa: B004
+        return self.kind == self.ASYNC_CALLABLE
+
+    @property
+    def is_async(self) -> bool:
+        return self.kind != self.SYNC
 
     def __call__(self, *args: Any, **kwargs: Any) -> Any:
         """
         Invokes the wrapped function when ttl is non-zero, decreases the ttl value when positive and returns its return
         value.
         """
-        result = None
-        if self.ttl != 0:
-            result = self.func(*args, **kwargs)
+        return self.func(*args, **kwargs) if self.consume() else None
+
+    def consume(self) -> bool:
+        """
+        Returns whether the function should be invoked, which is the case when ttl is non-zero, and decreases the ttl
+        value when positive.
+        """
+        if self.ttl < 0:
+            return True
 
-        if self.ttl > 0:
+        with self.lock:  # type: ignore[union-attr]
+            if self.ttl == 0:
+                return False
             self.ttl -= 1
 
-        return result
+        return True
+
+
+class WeakListener(Listener):
+    """
+    A :py:class:`Listener` that only keeps a weak reference to its function *func*, using a
+    :py:class:`weakref.WeakMethod` for bound methods. Once the function is garbage collected, :py:attr:`func` is
+    *None* and *callback* is invoked with this listener. All other arguments are forwarded to :py:class:`Listener`.
+    """
+
+    __slots__ = ("callback", "ref")
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        callback: Callable[[Listener], Any] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        self.callback = callback
+        super().__init__(func, *args, **kwargs)
+
+    @property  # type: ignore[override]
+    def func(self) -> Callable[..., Any] | None:
+        return self.ref()
+
+    @func.setter
+    def func(self, func: Callable[..., Any]) -> None:
+        ref_cls = weakref.WeakMethod if inspect.ismethod(func) else weakref.ref
+        self.ref = ref_cls(func, self._expire)
+
+    def _expire(self, ref: weakref.ref) -> None:
+        if self.callback is not None:
+            self.callback(self)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        func = self.func
+        return func(*args, **kwargs) if func is not None and self.consume() else None
+
+
+class Subscription:
+    """
+    Handle of a *listener* registered to an *emitter*, returned by :py:meth:`EventEmitter.on` and similar methods when
+    *subscription* is *True*. :py:meth:`off` removes exactly this registration in constant time, even when the same
+    function is registered multiple times.
+    """
+
+    __slots__ = ("emitter", "listener")
+
+    def __init__(self, emitter: EventEmitter, listener: Listener) -> None:
+        self.emitter = emitter
+        self.listener = listener
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} '{self.event}' {self.func!r} at {hex(id(self))}>"
+
+    @property
+    def func(self) -> Callable[..., Any]:
+        return self.listener.func
+
+    @property
+    def event(self) -> str:
+        return self.listener.event
+
+    @property
+    def active(self) -> bool:
+        """
+        Whether the listener is still registered.
+        """
+        node = self.listener.node
+        if node is None:
+            return self.listener in self.emitter._any_listeners
+        return self.listener in node.listeners
+
+    def off(self) -> bool:
+        """
+        Removes the listener and returns whether it was still registered.
+        """
+        return self.emitter._remove_listener(self.listener)
+
+
+class EventHandle:
+    """
+    Handle of an *event* of an *emitter*, returned by :py:meth:`EventEmitter.event`. Functions to invoke are resolved
+    on the first emit and kept together with the version of the registered functions of the emitter. Subsequent emits
+    skip parsing the event name and looking up functions until functions are added to or removed from the emitter.
+    """
+
+    __slots__ = ("_listeners", "_version", "emitter", "name")
+
+    def __init__(self, emitter: EventEmitter, name: str) -> None:
+        self.emitter = emitter
+        self.name = name
+        self._listeners: tuple[Listener, ...] = ()
+        self._version = -1
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} '{self.name}' at {hex(id(self))}>"
+
+    @property
+    def listeners(self) -> tuple[Listener, ...]:
+        """
+        Listeners that are invoked when emitting the event, resolved again when the emitter changed.
+        """
+        # read the version before resolving, so that concurrent changes lead to resolving again next time
+        version = self.emitter._cache_version
+        if version != self._version:
+            self._listeners = self.emitter._find_listeners(self.name)
+            self._version = version
+        return self._listeners
+
+    def emit(self, *args: Any, **kwargs: Any) -> list[concurrent.futures.Future]:
+        """
+        Emits the event with *args* and *kwargs* as :py:meth:`EventEmitter.emit`.
+        """
+        emitter = self.emitter
+        errors = emitter._new_errors()
+        pending = emitter._emit(self.name, args, kwargs, errors=errors, listeners=self.listeners)
+        futures = emitter._handle_pending(pending)
+        emitter._raise_errors(errors, self.name)
+
+        return futures
+
+    async def emit_async(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Emits the event with *args* and *kwargs* as :py:meth:`EventEmitter.emit_async`.
+        """
+        emitter = self.emitter
+        errors = emitter._new_errors()
+        loop = asyncio.get_running_loop()
+        awaitables = emitter._emit(self.name, args, kwargs, loop=loop, errors=errors, listeners=self.listeners)
+        if awaitables:
+            await asyncio.gather(*awaitables)
+        emitter._raise_errors(errors, self.name)
+
+    def on(self, func: Callable[..., Any] | None = None, **kwargs: Any) -> Any:
+        """
+        Registers a function to the event, see :py:meth:`EventEmitter.on`.
+        """
+        if func is None:
+            return self.emitter.on(self.name, **kwargs)
+        return self.emitter.on(self.name, func, **kwargs)
+
+    def once(self, func: Callable[..., Any] | None = None, **kwargs: Any) -> Any:
+        """
+        Registers a function to the event that is invoked only once, see :py:meth:`EventEmitter.once`.
+        """
+        if func is None:
+            return self.emitter.once(self.name, **kwargs)
+        return self.emitter.once(self.name, func, **kwargs)
+
+    def off(self, func: Callable[..., Any] | None = None) -> Any:
+        """
+        Removes a function from the event, see :py:meth:`EventEmitter.off`.
+        """
+        if func is None:
+            return self.emitter.off(self.name)
+        return self.emitter.off(self.name, func)
+
+
+class Namespace:
+    """
+    View on all events of an *emitter* whose names start with *name* followed by the delimiter of the emitter,
+    returned by :py:meth:`EventEmitter.namespace`. Event names passed to its methods are relative to the namespace.
+    """
+
+    __slots__ = ("emitter", "name", "prefix")
+
+    def __init__(self, emitter: EventEmitter, name: str) -> None:
+        self.emitter = emitter
+        self.name = name
+        self.prefix = name + emitter._event_tree.delimiter
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} '{self.name}' at {hex(id(self))}>"
+
+    def event(self, event: str) -> EventHandle:
+        """
+        Returns an :py:class:`EventHandle` of *event* within the namespace.
+        """
+        return EventHandle(self.emitter, self.prefix + event)
+
+    def namespace(self, namespace: str) -> Namespace:
+        """
+        Returns a nested :py:class:`Namespace`.
+        """
+        return Namespace(self.emitter, self.prefix + namespace)
+
+    def on(self, event: str, func: Callable[..., Any] | None = None, **kwargs: Any) -> Any:
+        """
+        Registers a function to *event* within the namespace, see :py:meth:`EventEmitter.on`.
+        """
+        if func is None:
+            return self.emitter.on(self.prefix + event, **kwargs)
+        return self.emitter.on(self.prefix + event, func, **kwargs)
+
+    def once(self, event: str, func: Callable[..., Any] | None = None, **kwargs: Any) -> Any:
+        """
+        Registers a function to *event* within the namespace that is invoked only once, see
+        :py:meth:`EventEmitter.once`.
+        """
+        if func is None:
+            return self.emitter.once(self.prefix + event, **kwargs)
+        return self.emitter.once(self.prefix + event, func, **kwargs)
+
+    def off(self, event: str, func: Callable[..., Any] | None = None) -> Any:
+        """
+        Removes a function from *event* within the namespace, see :py:meth:`EventEmitter.off`.
+        """
+        if func is None:
+            return self.emitter.off(self.prefix + event)
+        return self.emitter.off(self.prefix + event, func)
+
+    def listeners(self, event: str) -> list[Callable[..., Any]]:
+        """
+        Returns all functions that are registered to *event* within the namespace.
+        """
+        return self.emitter.listeners(self.prefix + event)
+
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> list[concurrent.futures.Future]:
+        """
+        Emits *event* within the namespace, see :py:meth:`EventEmitter.emit`.
+        """
+        return self.emitter.emit(self.prefix + event, *args, **kwargs)
+
+    async def emit_async(self, event: str, *args: Any, **kwargs: Any) -> None:
+        """
+        Emits *event* within the namespace, see :py:meth:`EventEmitter.emit_async`.
+        """
+        await self.emitter.emit_async(self.prefix + event, *args, **kwargs)
+
+
+class Metric:
+    """
+    Counter of calls with their cumulative, maximum and histogrammed durations in nanoseconds. The histogram maps
+    powers of two to the number of durations below them, starting with 1 ns.
+    """
+
+    __slots__ = ("count", "histogram", "max_ns", "total_ns")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram: dict[int, int] = {}
+
+    def add(self, duration_ns: int) -> None:
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+        # bucket by the next power of two
+        bucket = 1 << duration_ns.bit_length()
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "mean_ns": self.total_ns / self.count if self.count else 0.0,
+            "max_ns": self.max_ns,
+            "histogram": dict(sorted(self.histogram.items())),
+        }
+
+
+class Instrumentation:
+    """
+    Metrics of an :py:class:`EventEmitter` that are collected once enabled via :py:meth:`EventEmitter.instrument`.
+
+    For each emitted event name, a :py:class:`Metric` counts emits and measures the time to dispatch them, and when
+    *listeners* is *True*, another one counts calls per :py:class:`Listener` and measures their durations. For async
+    listeners and listeners dispatched to executors, only the time to create coroutines or to submit calls is measured.
+    Metrics of listeners are dropped once the listeners are removed from the instrumented emitter, and never keep them
+    alive otherwise, e.g. when they were removed while the emitter was not instrumented.
+
+    *pre_dispatch* is invoked before each emitted event with arguments ``(event, args, kwargs)``, and *post_dispatch*
+    after it with an additional ``duration_ns`` argument.
+    """
+
+    def __init__(
+        self,
+        *,
+        pre_dispatch: Callable[[str, tuple[Any, ...], dict[str, Any]], Any] | None = None,
+        post_dispatch: Callable[[str, tuple[Any, ...], dict[str, Any], int], Any] | None = None,
+        listeners: bool = True,
+    ) -> None:
+        self.pre_dispatch = pre_dispatch
+        self.post_dispatch = post_dispatch
+        self.listeners_enabled = listeners
+
+        # metrics per emitted event name and per listener
+        self.events: dict[str, Metric] = {}
+        self.listeners: weakref.WeakKeyDictionary[Listener, Metric] = weakref.WeakKeyDictionary()
+
+    def add_event(self, event: str, args: tuple[Any, ...], kwargs: dict[str, Any], duration_ns: int) -> None:
+        metric = self.events.get(event)
+        if metric is None:
+            metric = self.events[event] = Metric()
+        metric.add(duration_ns)
+
+        if self.post_dispatch is not None:
+            self.post_dispatch(event, args, kwargs, duration_ns)
+
+    def add_listener(self, listener: Listener, duration_ns: int) -> None:
+        metric = self.listeners.get(listener)
+        if metric is None:
+            metric = self.listeners[listener] = Metric()
+        metric.add(duration_ns)
+
+    def remove_listeners(self, listeners: Iterable[Listener]) -> None:
+        for listener in listeners:
+            self.listeners.pop(listener, None)
+
+    def reset(self) -> None:
+        """
+        Removes all collected metrics.
+        """
+        self.events.clear()
+        self.listeners.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns a snapshot of all metrics as a dictionary with the fields ``"events"``, mapping emitted event names to
+        metrics, and ``"listeners"``, a list of metrics of listeners with additional ``"event"`` and ``"func"`` fields.
+        Metrics are represented by dictionaries as returned by :py:meth:`Metric.to_dict`.
+        """
+        return {
+            "events": {event: metric.to_dict() for event, metric in list(self.events.items())},
+            "listeners": [
+                {"event": listener.event, "func": repr(listener.func), **metric.to_dict()}
+                for listener, metric in list(self.listeners.items())
+            ],
+        }
+
+
+class LoopRunner:
+    """
+    Runner owning an event loop in a background thread that awaitables of async listeners are submitted to via
+    :py:func:`asyncio.run_coroutine_threadsafe`. The thread is started lazily on first use, or explicitly with
+    :py:meth:`start`, and is named *name*. *daemon* is forwarded to :py:class:`threading.Thread`.
+
+    :py:meth:`stop` shuts the loop down, waiting for pending tasks to finish unless *cancel* is *True*. Runners can
+    be used as context managers, stopping them on exit. A stopped runner is restarted on next use.
+    """
+
+    def __init__(self, *, name: str = "pymitter-loop", daemon: bool = True) -> None:
+        self.name = name
+        self.daemon = daemon
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> LoopRunner:
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The event loop of the runner, starting it when not running yet.
+        """
+        loop = self._loop
+        if loop is None:
+            loop = self.start()
+        return loop
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """
+        Starts the background thread and its event loop if not running yet and returns the loop.
+        """
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                    loop.run_until_complete(loop.shutdown_asyncgens())
+                finally:
+                    loop.close()
+
+            thread = threading.Thread(target=run, name=self.name, daemon=self.daemon)
+            thread.start()
+            ready.wait()
+
+            self._loop, self._thread = loop, thread
+
+        return loop
+
+    def stop(self, *, cancel: bool = False, timeout: float | None = None) -> None:
+        """
+        Stops the event loop and joins the background thread for up to *timeout* seconds. Pending tasks are awaited
+        before, or cancelled when *cancel* is *True*.
+        """
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None:
+                return
+            self._loop, self._thread = None, None
+
+        async def shutdown() -> None:
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            if cancel:
+                for task in tasks:
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            loop.stop()
+
+        if thread is threading.current_thread():
+            # called from within the loop, so do not wait
+            loop.create_task(shutdown())  # noqa: RUF006
+            return
+
+        asyncio.run_coroutine_threadsafe(shutdown(), loop)
+        thread.join(timeout)
+
+    def in_loop_thread(self) -> bool:
+        """
+        Returns whether the caller runs in the background thread of the runner.
+        """
+        return self._thread is threading.current_thread()
+
+    def submit(self, awaitables: list[Awaitable]) -> concurrent.futures.Future:
+        """
+        Submits *awaitables*, which may also contain :py:class:`concurrent.futures.Future` objects, to the event loop
+        and returns a :py:class:`concurrent.futures.Future` that resolves to the list of their results.
+        """
+        if not awaitables:
+            future: concurrent.futures.Future = concurrent.futures.Future()
+            future.set_result([])
+            return future
+
+        async def gather() -> list[Any]:
+            return await asyncio.gather(*map(as_awaitable, awaitables))
+
+        return asyncio.run_coroutine_threadsafe(gather(), self.loop)
+
+    def schedule(self, awaitables: list[Awaitable]) -> asyncio.Future:
+        """
+        Schedules *awaitables* on the event loop without waiting, which must be called from within the loop thread.
+        """
+        return asyncio.ensure_future(asyncio.gather(*map(as_awaitable, awaitables)), loop=self.loop)
+
+
+class EventQueue:
+    """
+    Bounded queue of events that are emitted by a number of consumer *workers* via :py:meth:`EventEmitter.emit_async`
+    of an *emitter*, with at most *maxsize* events being queued at a time. Workers are started in the running event
+    loop on first use, or explicitly with :py:meth:`start`.
+
+    :py:meth:`emit` waits for a free slot when the queue is full, applying backpressure to producers, whereas
+    :py:meth:`emit_nowait` never waits and follows the *policy* instead, which is either ``"raise"`` to raise an
+    :py:class:`asyncio.QueueFull` exception, ``"drop"`` to discard the new event, or ``"drop_oldest"`` to discard the
+    oldest queued event. The number of discarded events is tracked in :py:attr:`dropped`.
+
+    :py:meth:`stop` shuts the workers down, by default after all queued events were emitted. Queues can be used as
+    async context managers, stopping them on exit. Exceptions raised by listeners are passed to the exception handler
+    of the event loop and do not stop workers.
+    """
+
+    policies = ("raise", "drop", "drop_oldest")
+
+    def __init__(
+        self,
+        emitter: EventEmitter,
+        *,
+        maxsize: int = 1000,
+        workers: int = 1,
+        policy: str = "raise",
+    ) -> None:
+        if policy not in self.policies:
+            raise ValueError(f"unknown policy '{policy}', must be one of {', '.join(self.policies)}")
+        if workers < 1:
+            raise ValueError(f"number of workers must be positive, got {workers}")
+
+        self.emitter = emitter
+        self.maxsize = maxsize
+        self.workers = workers
+        self.policy = policy
+        self.dropped = 0
+
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = False
+
+    async def __aenter__(self) -> EventQueue:
+        self.start()
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.stop()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def qsize(self) -> int:
+        """
+        Returns the number of queued events.
+        """
+        return 0 if self._queue is None else self._queue.qsize()
+
+    def start(self) -> None:
+        """
+        Creates the queue and starts the workers in the running event loop if not running yet.
+        """
+        if self._tasks:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [asyncio.ensure_future(self._work(self._queue)) for _ in range(self.workers)]
+
+    async def _work(self, queue: asyncio.Queue) -> None:
+        while True:
+            event, args, kwargs = await queue.get()
+            try:
+                await self.emitter.emit_async(event, *args, **kwargs)
+            except Exception as e:
+                asyncio.get_running_loop().call_exception_handler(
+                    {
+                        "message": f"exception while emitting queued event '{event}'",
+                        "exception": e,
+                    }
+                )
+            finally:
+                queue.task_done()
+
+    def _get_queue(self) -> asyncio.Queue:
+        if self._stopping:
+            raise RuntimeError("cannot emit events while the queue is stopping")
+        self.start()
+        return self._queue  # type: ignore[return-value]
+
+    async def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+        """
+        Queues an *event* to be emitted with *args* and *kwargs*, waiting for a free slot if the queue is full.
+        """
+        await self._get_queue().put((event, args, kwargs))
+
+    def emit_nowait(self, event: str, *args: Any, **kwargs: Any) -> bool:
+        """
+        Queues an *event* to be emitted with *args* and *kwargs* without waiting. When the queue is full, the
+        :py:attr:`policy` is applied. Returns *True* when the event was queued, and *False* when it was discarded.
+        """
+        queue = self._get_queue()
+        item = (event, args, kwargs)
+
+        try:
+            queue.put_nowait(item)
+        except asyncio.QueueFull:
+            if self.policy == "raise":
+                raise
+            self.dropped += 1
+            if self.policy == "drop":
+                return False
+            # drop the oldest event
+            queue.get_nowait()
+            queue.task_done()
+            queue.put_nowait(item)
+
+        return True
+
+    async def join(self) -> None:
+        """
+        Waits until all queued events were emitted.
+        """
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self, *, drain: bool = True) -> None:
+        """
+        Stops the workers, after emitting all queued events when *drain* is *True*. Otherwise, queued events are
+        discarded. Events cannot be queued while stopping.
+        """
+        if not self._tasks:
+            return
+
+        self._stopping = True
+        try:
+            if drain:
+                await self.join()
+
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        finally:
+            self._queue = None
+            self._tasks = []
+            self._stopping = False
@@ -0,0 +1,526 @@
+"""
+Benchmark suite of pymitter covering emits, wildcard lookups, async dispatch and registration at scale.
+
+Usage: python -m pymitter.bench [--filter PATTERN] [--repeat N] [--min-time SECONDS] [--json PATH] [--list]
+
+Each benchmark is timed with :py:mod:`timeit`, choosing the number of calls per round automatically so that a round
+takes at least *min_time* seconds. Results are reported in nanoseconds per operation, with the number of operations
+per call being defined by each benchmark. Sizes of all benchmarks are fixed so that results of different releases can
+be compared, e.g. via the machine-readable output of ``--json``.
+"""
+
+from __future__ import annotations
+
+__all__ = ["benchmarks", "main", "run"]
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import timeit
+from typing import Any, Callable
+
+import pymitter
+from pymitter import EventEmitter, Listener, LoopRunner, ThreadSafeEventEmitter
+from pymitter.bridge import Bridge
+from pymitter.journal import Journal
+from pymitter.transport import Client, Server
+
+# setup functions per benchmark name, returning a function to time, the number of operations per call and optionally
+# a function to clean up afterwards
+benchmarks: dict[str, tuple[str, Callable[[], tuple[Any, ...]]]] = {}
+
+
+def benchmark(name: str, description: str) -> Callable[[Callable], Callable]:
+    def decorator(setup: Callable[[], tuple[Any, ...]]) -> Callable:
+        benchmarks[name] = (description, setup)
+        return setup
+
+    return decorator
+
+
+def handler(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+async def async_handler(*args: Any, **kwargs: Any) -> None:
+    pass
+
+
+@benchmark("emit_literal", "emit of a literal event to 10 listeners")
+def bench_emit_literal() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    for _ in range(10):
+        ee.on("orders.created", handler)
+    return (lambda: ee.emit("orders.created", 1)), 1
+
+
+@benchmark("emit_wildcard", "emit of a literal event to 10 pattern listeners among 100 events")
+def bench_emit_wildcard() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter(wildcard=True)
+    for i in range(100):
+        ee.on(f"orders.o{i}.created", handler)
+    for _ in range(10):
+        ee.on("orders.*.created", handler)
+    return (lambda: ee.emit("orders.o0.created", 1)), 1
+
+
+@benchmark("emit_wildcard_uncached", "emit of 100 distinct events without dispatch cache in wildcard mode")
+def bench_emit_wildcard_uncached() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter(wildcard=True, cache_size=0)
+    events = [f"orders.o{i}.created" for i in range(100)]
+    for event in events:
+        ee.on(event, handler)
+    ee.on("orders.*.created", handler)
+
+    def run() -> None:
+        for event in events:
+            ee.emit(event, 1)
+
+    return run, len(events)
+
+
+@benchmark("emit_globstar", "emit of 100 distinct events reaching a '**' listener among 100 unrelated events")
+def bench_emit_globstar() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter(wildcard=True)
+    for i in range(100):
+        ee.on(f"users.u{i}.updated", handler)
+    ee.on("orders.**", handler)
+    events = [f"orders.o{i}.item.added" for i in range(100)]
+
+    def run() -> None:
+        for event in events:
+            ee.emit(event, 1)
+
+    return run, len(events)
+
+
+@benchmark("emit_any_filter", "emit of the events of emit_globstar to an 'any' listener filtering them by name")
+def bench_emit_any_filter() -> tuple[Callable[[], Any], int]:
+    # workaround for subscriptions to all events below a namespace before "**" was supported
+    ee = EventEmitter(wildcard=True)
+    for i in range(100):
+        ee.on(f"users.u{i}.updated", handler)
+
+    @ee.on_any
+    def any_handler(event: str, *args: Any) -> None:
+        if event.startswith("orders."):
+            handler(*args)
+
+    events = [f"orders.o{i}.item.added" for i in range(100)]
+
+    def run() -> None:
+        for event in events:
+            ee.emit(event, event, 1)
+
+    return run, len(events)
+
+
+@benchmark("emit_deep", "uncached emit of an event with 10 namespaces")
+def bench_emit_deep() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter(wildcard=True, cache_size=0)
+    event = ".".join(f"level{i}" for i in range(10))
+    ee.on(event, handler)
+    ee.on(".".join(["*"] * 10), handler)
+    return (lambda: ee.emit(event, 1)), 1
+
+
+@benchmark("emit_handle", "emit of a literal event to 10 listeners via an event handle")
+def bench_emit_handle() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    for _ in range(10):
+        ee.on("orders.created", handler)
+    handle = ee.event("orders.created")
+    return (lambda: handle.emit(1)), 1
+
+
+@benchmark("emit_compiled", "emit of a literal event to 10 listeners via a generated dispatcher")
+def bench_emit_compiled() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter(compiled=True)
+    for _ in range(10):
+        ee.on("orders.created", handler)
+    return (lambda: ee.emit("orders.created", 1)), 1
+
+
+@benchmark("emit_fanout", "emit of an event to 1000 listeners")
+def bench_emit_fanout() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    for _ in range(1000):
+        ee.on("broadcast", handler)
+    return (lambda: ee.emit("broadcast", 1)), 1
+
+
+@benchmark("emit_fanout_compiled", "emit of an event to 1000 listeners via a generated dispatcher")
+def bench_emit_fanout_compiled() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter(compiled=True)
+    for _ in range(1000):
+        ee.on("broadcast", handler)
+    return (lambda: ee.emit("broadcast", 1)), 1
+
+
+@benchmark("listener_kind", "classification of 10 listeners as sync or async by their kind set on registration")
+def bench_listener_kind() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    for _ in range(10):
+        ee.on("orders.created", handler)
+    listeners = ee._find_listeners("orders.created")
+
+    def run() -> int:
+        return sum(listener.kind != Listener.SYNC for listener in listeners)
+
+    return run, len(listeners)
+
+
+@benchmark("listener_kind_per_call", "classification of 10 listeners as sync or async by inspecting them per call")
+def bench_listener_kind_per_call() -> tuple[Callable[[], Any], int]:
+    # previous classification on every emit, before the kind was determined once on registration
+    ee = EventEmitter()
+    for _ in range(10):
+        ee.on("orders.created", handler)
+    listeners = ee._find_listeners("orders.created")
+
+    def run() -> int:
+        return sum(
+            asyncio.iscoroutinefunction(listener.func)
+            or asyncio.iscoroutinefunction(getattr(listener.func, "__call__", None))  # noqa: B004
+            for listener in listeners
+        )
+
+    return run, len(listeners)
+
+
+@benchmark("emit_many", "emit_many of an event with 100 argument tuples to 10 listeners")
+def bench_emit_many() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    for _ in range(10):
+        ee.on("orders.created", handler)
+    args_list = [(i,) for i in range(100)]
+    return (lambda: ee.emit_many("orders.created", args_list)), len(args_list)
+
+
+def emit_threads(ee: EventEmitter, n_threads: int) -> tuple[Callable[[], Any], int]:
+    # emits 1000 events from each thread concurrently, so the time per emit only decreases with more threads on
+    # free-threaded builds
+    for _ in range(10):
+        ee.on("orders.*", handler)
+
+    def emit() -> None:
+        for _ in range(1000):
+            ee.emit("orders.created", 1)
+
+    def run() -> None:
+        threads = [threading.Thread(target=emit) for _ in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return run, 1000 * n_threads
+
+
+# fixed numbers of threads rather than the number of cpus, so that results of different machines can be compared
+for _cls, _suffix, _note in [(EventEmitter, "", ""), (ThreadSafeEventEmitter, "_safe", ", thread-safe")]:
+    for _n_threads in (1, 2, 4, 8):
+        benchmark(
+            f"emit_threads{_suffix}_{_n_threads}",
+            f"emit of 1000 events to 10 pattern listeners from each of {_n_threads} threads{_note}",
+        )(lambda cls=_cls, n_threads=_n_threads: emit_threads(cls(wildcard=True), n_threads))
+
+
+@benchmark("once_churn", "registration of a once listener to a new event that is emitted and pruned")
+def bench_once_churn() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter(wildcard=True)
+    ee.on("jobs.*.done", handler)
+    events = [f"jobs.j{i}.done" for i in range(100)]
+
+    def run() -> None:
+        for event in events:
+            ee.once(event, handler)
+            ee.emit(event, 1)
+
+    return run, len(events)
+
+
+@benchmark("emit_async_new_loop", "emit of an event to an async listener, running a new event loop")
+def bench_emit_async_new_loop() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    ee.on("orders.created", async_handler)
+    return (lambda: ee.emit("orders.created", 1)), 1
+
+
+@benchmark("emit_async_runner", "emit of an event to an async listener, using a LoopRunner")
+def bench_emit_async_runner() -> tuple[Callable[[], Any], int]:
+    # the daemon thread of the runner is stopped on interpreter exit
+    ee = EventEmitter(runner=LoopRunner(name="pymitter-bench"))
+    ee.on("orders.created", async_handler)
+    return (lambda: ee.emit("orders.created", 1)), 1
+
+
+@benchmark("emit_async", "emit_async of 100 events to an async and a sync listener within a running loop")
+def bench_emit_async() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    ee.on("orders.created", async_handler)
+    ee.on("orders.created", handler)
+    loop = asyncio.new_event_loop()
+
+    async def emit() -> None:
+        for i in range(100):
+            await ee.emit_async("orders.created", i)
+
+    return (lambda: loop.run_until_complete(emit())), 100
+
+
+@benchmark("emit_future", "emit_future of 100 events to an async and a sync listener within a running loop")
+def bench_emit_future() -> tuple[Callable[[], Any], int]:
+    ee = EventEmitter()
+    ee.on("orders.created", async_handler)
+    ee.on("orders.created", handler)
+    loop = asyncio.new_event_loop()
+
+    async def emit() -> None:
+        for i in range(100):
+            ee.emit_future("orders.created", i)
+        # let all scheduled listeners finish
+        while len(asyncio.all_tasks()) > 1:
+            await asyncio.sleep(0)
+
+    return (lambda: loop.run_until_complete(emit())), 100
+
+
+@benchmark("register", "registration and removal of 10000 listeners to 1000 events via on and off")
+def bench_register() -> tuple[Callable[[], Any], int]:
+    events = [f"orders.o{i}.created" for i in range(1000)]
+
+    def run() -> None:
+        ee = EventEmitter(max_listeners=100000)
+        for _ in range(10):
+            for event in events:
+                ee.on(event, handler)
+        for event in events:
+            ee.off(event)
+
+    return run, 10 * len(events)
+
+
+@benchmark("subscribe", "registration and removal of 10000 listeners to 1000 events via subscriptions")
+def bench_subscribe() -> tuple[Callable[[], Any], int]:
+    events = [f"orders.o{i}.created" for i in range(1000)]
+
+    def run() -> None:
+        ee = EventEmitter(wildcard=True)
+        subs = [ee.on(event, handler, subscription=True) for _ in range(10) for event in events]
+        for sub in subs:
+            sub.off()
+
+    return run, 10 * len(events)
+
+
+@benchmark("bridge", "forwarding of 1000 events in batches of 100 through a bridge over a pipe")
+def bench_bridge() -> tuple[Callable[[], Any], int, Callable[[], Any]]:
+    conn1, conn2 = multiprocessing.Pipe()
+    ee = EventEmitter()
+    ee.on("orders.created", handler)
+    bridge1, bridge2 = Bridge(EventEmitter(), [conn1]), Bridge(ee, [conn2])
+
+    def run() -> None:
+        for _ in range(10):
+            for i in range(100):
+                bridge1.forward("orders.created", i)
+            bridge2.poll(None)
+
+    def cleanup() -> None:
+        bridge1.close()
+        bridge2.close()
+
+    return run, 1000, cleanup
+
+
+@benchmark("bridge_buffers", "forwarding of 10 events with 1 MB buffers through a bridge over a pipe")
+def bench_bridge_buffers() -> tuple[Callable[[], Any], int, Callable[[], Any]]:
+    conn1, conn2 = multiprocessing.Pipe()
+    ee = EventEmitter()
+    ee.on("frames.captured", handler)
+    bridge1, bridge2 = Bridge(EventEmitter(), [conn1], batch_size=1), Bridge(ee, [conn2])
+    frame = bytearray(1 << 20)
+
+    # messages are sent by the sender thread of the bridge while receiving
+    def run() -> None:
+        for _ in range(10):
+            bridge1.forward("frames.captured", frame)
+        n = 0
+        while n < 10:
+            n += bridge2.poll(None)
+
+    def cleanup() -> None:
+        bridge1.close()
+        bridge2.close()
+
+    return run, 10, cleanup
+
+
+@benchmark("transport", "publishing of 1000 events to a subscribed client over a localhost tcp connection")
+def bench_transport() -> tuple[Callable[[], Any], int, Callable[[], Any]]:
+    loop = asyncio.new_event_loop()
+    received: list[int] = []
+    ee = EventEmitter()
+    ee.on("orders.created", received.append)
+    server, client = Server(EventEmitter()), Client(ee)
+
+    async def setup() -> None:
+        await server.start()
+        await client.connect(port=server.address[1])
+        await client.subscribe("orders.*")
+
+    async def publish() -> None:
+        del received[:]
+        for i in range(1000):
+            server.publish("orders.created", i)
+            # let the loop write coalesced frames from time to time
+            if i % 100 == 99:
+                await asyncio.sleep(0)
+        while len(received) < 1000:
+            await asyncio.sleep(0)
+
+    async def teardown() -> None:
+        await client.close()
+        await server.close()
+
+    def cleanup() -> None:
+        loop.run_until_complete(teardown())
+        loop.close()
+
+    loop.run_until_complete(setup())
+    return (lambda: loop.run_until_complete(publish())), 1000, cleanup
+
+
+@benchmark("journal_record", "recording of 1000 emitted events in a journal attached to the emitter")
+def bench_journal_record() -> tuple[Callable[[], Any], int, Callable[[], Any]]:
+    tmp = tempfile.TemporaryDirectory()
+    journal = Journal(tmp.name)
+    ee = EventEmitter()
+    ee.on("orders.created", handler)
+    journal.attach(ee)
+
+    def run() -> None:
+        for i in range(1000):
+            ee.emit("orders.created", i, key="value")
+        journal.flush()
+
+    def cleanup() -> None:
+        journal.close()
+        tmp.cleanup()
+
+    return run, 1000, cleanup
+
+
+@benchmark("journal_replay", "replay of 10000 events from a journal, half of them matching a pattern")
+def bench_journal_replay() -> tuple[Callable[[], Any], int, Callable[[], Any]]:
+    tmp = tempfile.TemporaryDirectory()
+    journal = Journal(tmp.name)
+    for i in range(10000):
+        journal.record("orders.created" if i % 2 else "users.created", (i,), {"key": "value"})
+    ee = EventEmitter()
+    ee.on("orders.created", handler)
+
+    def cleanup() -> None:
+        journal.close()
+        tmp.cleanup()
+
+    return (lambda: journal.replay(ee, "orders.*")), 10000, cleanup
+
+
+def run(
+    pattern: str = "*",
+    *,
+    repeat: int = 5,
+    min_time: float = 0.2,
+    callback: Callable[[dict[str, Any]], Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Runs all benchmarks whose names match *pattern* and returns a list of results. Each result is a dictionary
+    containing the name, the number of operations per call and timings per operation in nanoseconds of *repeat*
+    rounds. *callback* is invoked with each result once available.
+    """
+    results = []
+    for name, (description, setup) in benchmarks.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+
+        func, ops, *cleanup = setup()
+        try:
+            timer = timeit.Timer(func)
+            number, t = timer.autorange()
+            number = max(1, int(number * min_time / max(t, 1e-9)))
+            times = [t / (number * ops) * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+        finally:
+            for _cleanup in cleanup:
+                _cleanup()
+
+        result = {
+            "name": name,
+            "description": description,
+            "ops": ops,
+            "number": number,
+            "repeat": repeat,
+            "min_ns": min(times),
+            "median_ns": statistics.median(times),
+            "times_ns": times,
+        }
+        results.append(result)
+        if callback is not None:
+            callback(result)
+
+    return results
+
+
+def main(argv: list[str] | None = None) -> None:
+    """
+    Command line entry point, see ``python -m pymitter.bench --help``.
+    """
+    parser = argparse.ArgumentParser(prog="python -m pymitter.bench", description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--filter", "-f", default="*", help="pattern of benchmarks to run, default: *")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="number of rounds per benchmark, default: 5")
+    parser.add_argument("--min-time", "-t", type=float, default=0.2, help="minimum seconds per round, default: 0.2")
+    parser.add_argument("--json", "-j", metavar="PATH", help="write results as json to PATH, or '-' for stdout")
+    parser.add_argument("--list", "-l", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (description, _) in benchmarks.items():
+            print(f"{name:<24} {description}")
+        return
+
+    def report(result: dict[str, Any]) -> None:
+        print(f"{result['name']:<24} {result['min_ns']:>14,.1f} ns/op (median {result['median_ns']:,.1f})")
+
+    # only print the table when json is not written to stdout
+    results = run(
+        args.filter, repeat=args.repeat, min_time=args.min_time, callback=None if args.json == "-" else report
+    )
+
+    if args.json:
+        data = {
+            "pymitter": pymitter.__version__,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "gil": getattr(sys, "_is_gil_enabled", lambda: True)(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "results": results,
+        }
+        if args.json == "-":
+            print(json.dumps(data, indent=2))
+        else:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
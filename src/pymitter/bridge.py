@@ -0,0 +1,295 @@
+"""
+Bridge forwarding events between emitters of different processes over :py:mod:`multiprocessing` connections.
+"""
+
+from __future__ import annotations
+
+__all__ = ["Bridge"]
+
+import pickle
+import queue
+import struct
+import sys
+import threading
+from collections.abc import Callable, Iterable
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+from pymitter import EventEmitter, Tree
+
+# header of each message, containing the number of out-of-band buffers that follow as separate messages
+header = struct.Struct("!I")
+
+
+class Bridge:
+    """
+    Bridge connecting an *emitter* to emitters in other processes through *connections*, which are
+    :py:class:`multiprocessing.connection.Connection` objects such as ends of :py:func:`multiprocessing.Pipe`.
+
+    Events emitted through :py:meth:`emit` are emitted locally as usual and, when their names match one of the
+    *patterns*, forwarded to all connections. Patterns are always evaluated with wildcards, using the delimiter of the
+    *emitter*. Events emitted directly through the emitter stay local. Forwarded events are collected and sent in
+    batches of up to *batch_size* events, or earlier by :py:meth:`flush`. They are pickled with protocol 5, sending
+    buffers of at least *buffer_size* bytes of objects that support it, such as :py:class:`bytearray` or
+    :py:class:`pickle.PickleBuffer`, out-of-band without copying them into the pickled data. Messages are sent by a
+    separate daemon thread, so that sending to a connection whose other side is busy never blocks receiving, and
+    buffers sent out-of-band should not be modified until they were sent.
+
+    Received events are emitted through :py:meth:`EventEmitter.emit_batch` of the *emitter* by :py:meth:`poll`, either
+    by calling it explicitly or within the background thread started by :py:meth:`start`, which also flushes forwarded
+    events every *interval* seconds. Received events are not forwarded again, unless *relay* is *True* in which case
+    they are passed on to all other connections unchanged, e.g. in a parent process connected to multiple workers.
+    Exceptions raised while emitting received events are passed to *error_handler* with the exception as the only
+    argument, or reported through :py:func:`sys.excepthook` when not set, and never remove the connection. Only
+    connections that fail to receive or send messages, e.g. when closed by the other side, are removed. When events
+    are also emitted from other threads while the background thread is running, the *emitter* should be a
+    :py:class:`ThreadSafeEventEmitter`.
+    """
+
+    def __init__(
+        self,
+        emitter: EventEmitter,
+        connections: Iterable[Connection] = (),
+        *,
+        patterns: Iterable[str] = ("**",),
+        batch_size: int = 100,
+        buffer_size: int = 65536,
+        interval: float = 0.01,
+        relay: bool = False,
+        error_handler: Callable[[Exception], Any] | None = None,
+    ) -> None:
+        self.emitter = emitter
+        self.connections = list(connections)
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        self.interval = interval
+        self.patterns = tuple(patterns)
+        self.relay = relay
+        self.error_handler = error_handler
+
+        # tree evaluating patterns with wildcards and cache of event names that match them
+        self._tree = Tree(wildcard=True, delimiter=emitter._event_tree.delimiter)
+        self._matches: dict[str, bool] = {}
+
+        # events to send in the next batch and lock protecting it
+        self._batch: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+        self._lock = threading.RLock()
+
+        # sender thread, which is started on the first message, and its queue of messages to send
+        self._sender: threading.Thread | None = None
+        self._queue: queue.SimpleQueue[tuple[bytes, list[Any], list[Connection]] | None] = queue.SimpleQueue()
+
+        # background thread
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    def __enter__(self) -> Bridge:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def add(self, connection: Connection) -> None:
+        """
+        Adds a *connection* to forward events to and receive events from.
+        """
+        with self._lock:
+            self.connections = [*self.connections, connection]
+
+    def remove(self, connection: Connection) -> bool:
+        """
+        Removes a *connection* without closing it and returns whether it was added before.
+        """
+        with self._lock:
+            if connection not in self.connections:
+                return False
+            self.connections = [conn for conn in self.connections if conn is not connection]
+        return True
+
+    def matches(self, event: str) -> bool:
+        """
+        Returns whether *event* matches one of the patterns of events to forward.
+        """
+        match = self._matches.get(event)
+        if match is None:
+            # bound the cache of event names
+            if len(self._matches) >= 1024:
+                self._matches.clear()
+            match = any(self._tree.match(event, pattern) for pattern in self.patterns)
+            self._matches[event] = match
+        return match
+
+    def emit(self, event: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Emits *event* through :py:meth:`EventEmitter.emit` of the emitter and forwards it to all connections when it
+        matches one of the patterns. The return value of :py:meth:`EventEmitter.emit` is passed through.
+        """
+        self.forward(event, *args, **kwargs)
+        return self.emitter.emit(event, *args, **kwargs)
+
+    async def emit_async(self, event: str, *args: Any, **kwargs: Any) -> None:
+        """
+        Awaitable version of :py:meth:`emit` using :py:meth:`EventEmitter.emit_async`.
+        """
+        self.forward(event, *args, **kwargs)
+        await self.emitter.emit_async(event, *args, **kwargs)
+
+    def forward(self, event: str, *args: Any, **kwargs: Any) -> bool:
+        """
+        Only forwards *event* to all connections when it matches one of the patterns, without emitting it locally, and
+        returns whether it was forwarded.
+        """
+        if not self.matches(event):
+            return False
+
+        with self._lock:
+            self._batch.append((event, args, kwargs))
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+        return True
+
+    def flush(self) -> int:
+        """
+        Queues all collected events for sending to all connections and returns their number.
+        """
+        with self._lock:
+            batch, self._batch = self._batch, []
+            if not batch or not self.connections:
+                return len(batch)
+
+            # large buffers are sent out-of-band when the callback returns a false value
+            buffers: list[pickle.PickleBuffer] = []
+
+            def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+                if buffer.raw().nbytes < self.buffer_size:
+                    return True
+                buffers.append(buffer)
+                return False
+
+            data = pickle.dumps(batch, protocol=5, buffer_callback=buffer_callback)
+            self._send(header.pack(len(buffers)) + data, buffers, self.connections)
+
+        return len(batch)
+
+    def _send(self, data: bytes, buffers: list[Any], connections: list[Connection]) -> None:
+        # queues the message and its out-of-band buffers for the sender thread, which keeps their order
+        with self._lock:
+            if self._sender is None:
+                self._queue = queue.SimpleQueue()
+                self._sender = threading.Thread(
+                    target=self._run_sender,
+                    args=(self._queue,),
+                    name="pymitter-bridge-sender",
+                    daemon=True,
+                )
+                self._sender.start()
+            self._queue.put((data, buffers, connections))
+
+    def _run_sender(self, messages: queue.SimpleQueue[tuple[bytes, list[Any], list[Connection]] | None]) -> None:
+        # sends queued messages to their connections until receiving None, dropping connections that were closed
+        while (message := messages.get()) is not None:
+            data, buffers, connections = message
+            for conn in connections:
+                try:
+                    conn.send_bytes(data)
+                    for buffer in buffers:
+                        conn.send_bytes(buffer.raw() if isinstance(buffer, pickle.PickleBuffer) else buffer)
+                except (EOFError, OSError):
+                    self.remove(conn)
+
+    def _stop_sender(self) -> None:
+        # waits until all queued messages are sent and stops the sender thread
+        with self._lock:
+            sender, self._sender = self._sender, None
+            if sender is None:
+                return
+            self._queue.put(None)
+        sender.join()
+
+    def _receive(self, conn: Connection) -> tuple[bytes, list[bytes]]:
+        # receives a message with its out-of-band buffers and passes it on unchanged when relaying
+        data = conn.recv_bytes()
+        n_buffers = header.unpack_from(data)[0]
+        buffers = [conn.recv_bytes() for _ in range(n_buffers)]
+
+        if self.relay:
+            with self._lock:
+                self._send(data, buffers, [_conn for _conn in self.connections if _conn is not conn])
+
+        return data, buffers
+
+    def _handle_error(self, exc: Exception) -> None:
+        if self.error_handler is not None:
+            self.error_handler(exc)
+        else:
+            sys.excepthook(type(exc), exc, exc.__traceback__)
+
+    def poll(self, timeout: float | None = 0.0) -> int:
+        """
+        Receives messages from all connections that are ready within *timeout* seconds, emits their events locally and
+        returns the number of received messages. Connections closed by the other side are removed, while exceptions
+        raised by listeners are passed to the error handler. A *timeout* of *None* blocks until at least one message is
+        received.
+        """
+        connections = self.connections
+        if not connections:
+            return 0
+
+        n = 0
+        for conn in wait(connections, timeout):
+            try:
+                data, buffers = self._receive(conn)  # type: ignore[arg-type]
+            except (EOFError, OSError):
+                self.remove(conn)  # type: ignore[arg-type]
+                continue
+            n += 1
+
+            try:
+                batch = pickle.loads(memoryview(data)[header.size :], buffers=buffers)
+                self.emitter.emit_batch(batch)
+            except Exception as e:
+                self._handle_error(e)
+
+        return n
+
+    def start(self) -> None:
+        """
+        Starts a daemon thread that receives messages and emits their events, and flushes forwarded events every
+        :py:attr:`interval` seconds, until :py:meth:`stop` is called.
+        """
+        if self._thread is not None:
+            return
+
+        def run() -> None:
+            while not self._stop.is_set():
+                self.flush()
+                if self.connections:
+                    self.poll(self.interval)
+                else:
+                    self._stop.wait(self.interval)
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=run, name="pymitter-bridge", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the background thread started by :py:meth:`start`, flushes remaining events and waits until all queued
+        messages are sent.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+        self._stop_sender()
+
+    def close(self) -> None:
+        """
+        Stops the background threads, flushes remaining events and closes all connections.
+        """
+        self.stop()
+        with self._lock:
+            connections, self.connections = self.connections, []
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,331 @@
+"""
+Append-only journal of emitted events, persisted in rotated segment files that can be replayed into emitters.
+"""
+
+from __future__ import annotations
+
+__all__ = ["Journal"]
+
+import bisect
+import mmap
+import os
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from struct import Struct
+from typing import Any
+
+from pymitter import EventEmitter, Instrumentation, Tree
+from pymitter.transport import PickleSerializer
+
+# header of each record, containing the size of the record after the size field, the timestamp and the size of the
+# encoded event name, followed by the event name and the serialized arguments
+record_header = Struct("!IdH")
+
+# entry of an index file, containing the timestamp and offset of a record in the segment file
+index_entry = Struct("!dQ")
+
+
+class Journal:
+    """
+    Append-only journal of events stored in segment files within a *directory*. Events are added through
+    :py:meth:`record`, which can also be invoked for every event emitted by an emitter after :py:meth:`attach`.
+    Arguments are serialized by *serializer*, defaulting to a :py:class:`~pymitter.transport.PickleSerializer`.
+
+    Records are collected in memory and written at once when exceeding *buffer_size* bytes, on :py:meth:`flush`, or
+    every *interval* seconds by a background thread when positive. Written records are synced to disk when *sync* is
+    *True*. A new segment is started when a segment would exceed *segment_size* bytes, as well as each
+    time a journal is opened. For each segment, an index file stores timestamps and offsets of records at least
+    *index_interval* bytes apart, which allows seeking to a point in time without scanning the segment. Timestamps are
+    never decreasing within a journal, even when the system clock is adjusted or moved back before opening it again.
+
+    :py:meth:`read` and :py:meth:`replay` map segments into memory and iterate over their records, optionally
+    filtered by patterns of event names, which are evaluated with wildcards using *delimiter*, and by a range of
+    timestamps.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        serializer: Any = None,
+        segment_size: int = 1 << 26,
+        buffer_size: int = 1 << 20,
+        index_interval: int = 1 << 16,
+        interval: float = 0.0,
+        sync: bool = False,
+        delimiter: str = ".",
+    ) -> None:
+        self.directory = directory
+        self.serializer = serializer or PickleSerializer()
+        self.segment_size = segment_size
+        self.buffer_size = buffer_size
+        self.index_interval = index_interval
+        self.interval = interval
+        self.sync = sync
+        self.delimiter = delimiter
+
+        os.makedirs(directory, exist_ok=True)
+
+        # state of the segment being written, which is created on the first record
+        self._lock = threading.RLock()
+        self._segment = max(self._segment_numbers(), default=-1)
+        self._file: Any = None
+        self._index_file: Any = None
+        self._offset = 0
+        self._index_offset = -1
+        self._last_time = self._read_last_time()
+
+        # records and index entries not written yet
+        self._buffer = bytearray()
+        self._index_buffer = bytearray()
+
+        # background thread
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        if interval > 0:
+            self._thread = threading.Thread(target=self._run, name="pymitter-journal", daemon=True)
+            self._thread.start()
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _segment_numbers(self) -> list[int]:
+        return sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".log"))
+
+    def _segment_path(self, segment: int, ext: str = "log") -> str:
+        return os.path.join(self.directory, f"{segment:010d}.{ext}")
+
+    @property
+    def segments(self) -> list[str]:
+        """
+        Paths of all segment files in order.
+        """
+        return [self._segment_path(segment) for segment in self._segment_numbers()]
+
+    def attach(self, emitter: EventEmitter) -> Instrumentation:
+        """
+        Records all events emitted by *emitter* by setting :py:meth:`record` as the ``pre_dispatch`` hook of a new
+        :py:class:`~pymitter.Instrumentation` that does not collect metrics of listeners, and returns it. This
+        replaces any previous instrumentation of *emitter*, see :py:meth:`EventEmitter.instrument`.
+        """
+        return emitter.instrument(pre_dispatch=self.record, listeners=False)
+
+    def detach(self, emitter: EventEmitter) -> None:
+        """
+        Stops recording events emitted by *emitter*.
+        """
+        emitter.uninstrument()
+
+    def record(self, event: str, args: tuple[Any, ...] = (), kwargs: dict[str, Any] | None = None) -> None:
+        """
+        Appends an *event* with *args* and *kwargs* to the journal.
+        """
+        name = event.encode("utf-8")
+        data = self.serializer.dumps((args, kwargs or {}))
+        size = record_header.size - 4 + len(name) + len(data)
+
+        with self._lock:
+            # timestamps must not decrease for seeking by time
+            timestamp = self._last_time = max(time.time(), self._last_time)
+
+            # start a new segment when needed
+            if self._file is None or (self._offset and self._offset + 4 + size > self.segment_size):
+                self._rotate()
+
+            # add an index entry for the first record and then in intervals
+            if self._index_offset < 0 or self._offset - self._index_offset >= self.index_interval:
+                self._index_buffer += index_entry.pack(timestamp, self._offset)
+                self._index_offset = self._offset
+
+            self._buffer += record_header.pack(size, timestamp, len(name))
+            self._buffer += name
+            self._buffer += data
+            self._offset += 4 + size
+
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+
+    def _rotate(self) -> None:
+        # flush and close the current segment and open the next one
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._index_file.close()
+
+        self._segment += 1
+        self._file = open(self._segment_path(self._segment), "ab")  # noqa: SIM115
+        self._index_file = open(self._segment_path(self._segment, "idx"), "ab")  # noqa: SIM115
+        self._offset = 0
+        self._index_offset = -1
+
+    def flush(self) -> None:
+        """
+        Writes all collected records in a single write and syncs them to disk when *sync* is *True*. Index entries
+        are only written after the records they point to.
+        """
+        with self._lock:
+            if self._file is None or not self._buffer:
+                return
+
+            self._file.write(self._buffer)
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+            self._buffer.clear()
+
+            if self._index_buffer:
+                self._index_file.write(self._index_buffer)
+                self._index_file.flush()
+                self._index_buffer.clear()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self) -> None:
+        """
+        Stops the background thread, writes remaining records and closes the current segment.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+        with self._lock:
+            self.flush()
+            if self._file is not None:
+                self._file.close()
+                self._index_file.close()
+                self._file = self._index_file = None
+
+    def _read_last_time(self) -> float:
+        # returns the timestamp of the last complete record of existing segments, so that timestamps of new records do
+        # not decrease when the system clock moved back between opening journals
+        for segment in reversed(self._segment_numbers()):
+            path = self._segment_path(segment)
+            if os.path.getsize(path) == 0:
+                continue
+
+            # scan from the last indexed record to the last complete one
+            index = self._read_index(segment)
+            offset = index[-1][1] if index else 0
+            timestamp = None
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                while offset + record_header.size <= len(mm):
+                    size, _timestamp, _ = record_header.unpack_from(mm, offset)
+                    if offset + 4 + size > len(mm):
+                        break
+                    timestamp = _timestamp
+                    offset += 4 + size
+            if timestamp is not None:
+                return timestamp
+
+        return 0.0
+
+    def _read_index(self, segment: int) -> list[tuple[float, int]]:
+        path = self._segment_path(segment, "idx")
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = f.read()
+        n = len(data) // index_entry.size
+        return list(index_entry.iter_unpack(data[: n * index_entry.size]))
+
+    def read(
+        self,
+        patterns: str | Iterable[str] | None = None,
+        *,
+        start: float | None = None,
+        end: float | None = None,
+    ) -> Iterator[tuple[float, str, tuple[Any, ...], dict[str, Any]]]:
+        """
+        Iterates over all recorded events as ``(timestamp, event, args, kwargs)`` tuples in the order they were
+        recorded. Events can be filtered by event name *patterns*, which are always evaluated with wildcards, and by
+        timestamps between *start* and *end*, both inclusive. Collected records are written before reading.
+        """
+        self.flush()
+
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        patterns = None if patterns is None else tuple(patterns)
+        tree = Tree(wildcard=True, delimiter=self.delimiter)
+        matches: dict[str, bool] = {}
+
+        segments = self._segment_numbers()
+        indices = [self._read_index(segment) for segment in segments]
+        for i, segment in enumerate(segments):
+            index = indices[i]
+
+            # skip segments that end before start, and stop at segments that begin after end
+            if start is not None and i + 1 < len(segments) and indices[i + 1] and indices[i + 1][0][0] < start:
+                continue
+            if end is not None and index and index[0][0] > end:
+                break
+
+            # seek to the last indexed record before start
+            offset = 0
+            if start is not None and index:
+                pos = bisect.bisect_left(index, (start, -1)) - 1
+                if pos >= 0:
+                    offset = index[pos][1]
+
+            path = self._segment_path(segment)
+            if os.path.getsize(path) == 0:
+                continue
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                total_size = len(mm)
+                header_size = record_header.size
+                while offset + header_size <= total_size:
+                    size, timestamp, name_size = record_header.unpack_from(mm, offset)
+                    # stop at records that were not written completely
+                    if offset + 4 + size > total_size:
+                        break
+                    if end is not None and timestamp > end:
+                        return
+                    name_offset = offset + header_size
+                    offset += 4 + size
+                    if start is not None and timestamp < start:
+                        continue
+
+                    event = mm[name_offset : name_offset + name_size].decode("utf-8")
+                    if patterns is not None:
+                        match = matches.get(event)
+                        if match is None:
+                            match = matches[event] = any(tree.match(event, pattern) for pattern in patterns)
+                        if not match:
+                            continue
+
+                    args, kwargs = self.serializer.loads(mm[name_offset + name_size : offset])
+                    yield timestamp, event, tuple(args), kwargs
+
+    def replay(
+        self,
+        emitter: EventEmitter,
+        patterns: str | Iterable[str] | None = None,
+        *,
+        start: float | None = None,
+        end: float | None = None,
+        batch_size: int = 1000,
+    ) -> int:
+        """
+        Emits all recorded events selected as in :py:meth:`read` through :py:meth:`EventEmitter.emit_batch` of an
+        *emitter* in batches of *batch_size* events, and returns their number. The *emitter* should not be attached to
+        this journal, as replayed events would be recorded again.
+        """
+        n = 0
+        batch: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+        for _, event, args, kwargs in self.read(patterns, start=start, end=end):
+            batch.append((event, args, kwargs))
+            if len(batch) >= batch_size:
+                emitter.emit_batch(batch)
+                n += len(batch)
+                batch = []
+        if batch:
+            emitter.emit_batch(batch)
+            n += len(batch)
+
+        return n
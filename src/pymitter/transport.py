@@ -0,0 +1,434 @@
+"""
+Socket transport publishing events of an emitter to subscribed emitters of other processes over Unix domain sockets
+or TCP connections.
+"""
+
+from __future__ import annotations
+
+__all__ = ["Client", "Connection", "JSONSerializer", "PickleSerializer", "Server"]
+
+import asyncio
+import json
+import pickle
+import struct
+from typing import Any
+
+from pymitter import EventEmitter, Tree
+
+# prefix of each frame containing the length of the serialized message
+header = struct.Struct("!I")
+
+
+class PickleSerializer:
+    """
+    Serializer of messages using :py:mod:`pickle` with a *protocol* that defaults to the highest one. Serializers can
+    be replaced by any object providing ``dumps(obj) -> bytes`` and ``loads(data) -> obj``.
+    """
+
+    def __init__(self, protocol: int = pickle.HIGHEST_PROTOCOL) -> None:
+        self.protocol = protocol
+
+    def dumps(self, obj: Any) -> bytes:
+        return pickle.dumps(obj, protocol=self.protocol)
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)
+
+
+class JSONSerializer:
+    """
+    Serializer of messages using :py:mod:`json`, which is limited to arguments that can be represented in json, but
+    does not allow executing code when loading messages of untrusted peers.
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+# serializer of subscription requests, which never uses the serializer of events so that servers do not load pickled
+# data of clients
+control_serializer = JSONSerializer()
+
+
+async def read_frame(reader: asyncio.StreamReader, max_size: int | None = None) -> bytes:
+    """
+    Reads a single length-prefixed frame from *reader* and returns its payload. A :py:class:`ValueError` is raised
+    without reading the payload when its size exceeds *max_size* bytes.
+    """
+    size = header.unpack(await reader.readexactly(header.size))[0]
+    if max_size is not None and size > max_size:
+        raise ValueError(f"frame of {size} bytes exceeds maximum size of {max_size} bytes")
+    return await reader.readexactly(size)
+
+
+def _parse_request(data: bytes) -> tuple[str, list[str]]:
+    # loads a subscription request of a client and returns its action and patterns, raising for malformed requests
+    request = control_serializer.loads(data)
+    if (
+        not isinstance(request, list)
+        or len(request) != 2
+        or request[0] not in ("subscribe", "unsubscribe")
+        or not isinstance(request[1], list)
+        or not all(isinstance(pattern, str) for pattern in request[1])
+    ):
+        raise ValueError(f"malformed request {request!r}")
+    return request[0], request[1]
+
+
+class Connection:
+    """
+    Connection of a client to a :py:class:`Server`, keeping track of its subscribed *patterns* and of frames that are
+    not written yet.
+    """
+
+    def __init__(self, server: Server, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.server = server
+        self.reader = reader
+        self.writer = writer
+        self.patterns: list[str] = []
+        self.dropped = 0
+
+        self._matches: dict[str, bool] = {}
+        self._buffer = bytearray()
+        self._flush_handle: asyncio.Handle | None = None
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} {self.writer.get_extra_info('peername')!r} at {hex(id(self))}>"
+
+    @property
+    def closed(self) -> bool:
+        return self.writer.is_closing()
+
+    def subscribe(self, patterns: list[str]) -> None:
+        self.patterns.extend(pattern for pattern in patterns if pattern not in self.patterns)
+        self._matches.clear()
+
+    def unsubscribe(self, patterns: list[str]) -> None:
+        self.patterns = [pattern for pattern in self.patterns if pattern not in patterns]
+        self._matches.clear()
+
+    def matches(self, event: str) -> bool:
+        """
+        Returns whether *event* matches one of the subscribed patterns.
+        """
+        match = self._matches.get(event)
+        if match is None:
+            # bound the cache of event names
+            if len(self._matches) >= 1024:
+                self._matches.clear()
+            tree = self.server._tree
+            match = self._matches[event] = any(tree.match(event, pattern) for pattern in self.patterns)
+        return match
+
+    def send(self, frame: bytes) -> bool:
+        """
+        Queues a *frame* to be written, coalesced with other frames until the buffer exceeds the coalesce size of the
+        server or the flush delay passed. When the client does not keep up and the amount of unwritten data would
+        exceed the buffer size of the server, its policy is applied. Returns whether the frame was queued.
+        """
+        if self.closed:
+            return False
+
+        server = self.server
+        if self.writer.transport.get_write_buffer_size() + len(self._buffer) + len(frame) > server.max_buffer:
+            if server.policy == "disconnect":
+                self.close(abort=True)
+                return False
+            self.dropped += 1
+            return False
+
+        self._buffer += frame
+        if len(self._buffer) >= server.coalesce_size:
+            self.flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if server.delay > 0:
+                self._flush_handle = loop.call_later(server.delay, self.flush)
+            else:
+                self._flush_handle = loop.call_soon(self.flush)
+        return True
+
+    def flush(self) -> None:
+        """
+        Writes all queued frames at once.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._buffer and not self.closed:
+            self.writer.write(bytes(self._buffer))
+        self._buffer.clear()
+
+    def close(self, abort: bool = False) -> None:
+        """
+        Closes the connection, discarding queued frames. Unless *abort* is *True*, data already passed to the
+        transport is still written.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self._buffer.clear()
+        if abort:
+            self.writer.transport.abort()
+        else:
+            self.writer.close()
+
+
+class Server:
+    """
+    Server publishing events of an *emitter* to clients connected over a Unix domain socket or TCP, see
+    :py:meth:`start`. Clients subscribe to event patterns, which are always evaluated with wildcards using the
+    delimiter of the *emitter*, so that events not matching any of them are never sent to them.
+
+    Events emitted through :py:meth:`emit` are emitted locally via :py:meth:`EventEmitter.emit_async` and published to
+    all subscribed clients. Events are serialized by *serializer*, defaulting to a :py:class:`PickleSerializer`, and
+    sent as frames prefixed by their length. Subscription requests of clients are always encoded as json, regardless of
+    the *serializer*, and connections of clients sending malformed requests or frames larger than *max_frame_size*
+    bytes are closed. Frames sent to the same client are coalesced into a single write until they exceed
+    *coalesce_size* bytes, or until the end of the current iteration of the event loop, or after *delay* seconds when
+    positive.
+
+    Data not yet written to a client is limited to *max_buffer* bytes. Once exceeded because the client does not keep
+    up, the *policy* is applied, which is either ``"drop"`` to discard new events for this client, counted in
+    :py:attr:`Connection.dropped`, or ``"disconnect"`` to close its connection.
+    """
+
+    policies = ("drop", "disconnect")
+
+    def __init__(
+        self,
+        emitter: EventEmitter,
+        *,
+        serializer: Any = None,
+        max_buffer: int = 1 << 20,
+        policy: str = "drop",
+        coalesce_size: int = 1 << 16,
+        delay: float = 0.0,
+        max_frame_size: int = 1 << 16,
+    ) -> None:
+        if policy not in self.policies:
+            raise ValueError(f"unknown policy '{policy}', must be one of {', '.join(self.policies)}")
+
+        self.emitter = emitter
+        self.serializer = serializer or PickleSerializer()
+        self.max_buffer = max_buffer
+        self.policy = policy
+        self.coalesce_size = coalesce_size
+        self.delay = delay
+        self.max_frame_size = max_frame_size
+        self.connections: list[Connection] = []
+
+        self._tree = Tree(wildcard=True, delimiter=emitter._event_tree.delimiter)
+        self._server: asyncio.Server | None = None
+
+    async def __aenter__(self) -> Server:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def address(self) -> Any:
+        """
+        Address the server listens on, being the socket path or a ``(host, port)`` tuple.
+        """
+        if self._server is None:
+            return None
+        return self._server.sockets[0].getsockname()
+
+    async def start(self, path: str | None = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Starts listening on a Unix domain socket at *path*, or on *host* and *port* otherwise, with port 0 choosing a
+        free port. See :py:attr:`address` for the actual address.
+        """
+        if self._server is not None:
+            raise RuntimeError("server already started")
+
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # serve requests of a single connection until it is closed
+        conn = Connection(self, reader, writer)
+        self.connections.append(conn)
+        try:
+            while True:
+                action, patterns = _parse_request(await read_frame(reader, self.max_frame_size))
+                if action == "subscribe":
+                    conn.subscribe(patterns)
+                else:
+                    conn.unsubscribe(patterns)
+                # acknowledge the request with an empty frame after queued frames, regardless of buffer limits
+                conn.flush()
+                writer.write(header.pack(0))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # closed connections, oversized frames and malformed requests
+            pass
+        finally:
+            self.connections.remove(conn)
+            conn.close()
+
+    def _frame(self, message: Any) -> bytes:
+        data = self.serializer.dumps(message)
+        return header.pack(len(data)) + data
+
+    def publish(self, event: str, *args: Any, **kwargs: Any) -> int:
+        """
+        Sends *event* to all clients that subscribed to it without emitting it locally, and returns the number of
+        clients it was sent to.
+        """
+        n = 0
+        frame = None
+        for conn in self.connections:
+            if not conn.matches(event):
+                continue
+            # serialize only once for all clients
+            if frame is None:
+                frame = self._frame(["event", event, args, kwargs])
+            n += conn.send(frame)
+        return n
+
+    async def emit(self, event: str, *args: Any, **kwargs: Any) -> None:
+        """
+        Publishes *event* to all subscribed clients and emits it locally through :py:meth:`EventEmitter.emit_async`.
+        """
+        self.publish(event, *args, **kwargs)
+        await self.emitter.emit_async(event, *args, **kwargs)
+
+    async def close(self) -> None:
+        """
+        Stops listening and closes all connections after writing queued frames.
+        """
+        if self._server is not None:
+            self._server.close()
+        for conn in list(self.connections):
+            conn.flush()
+            conn.writer.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+
+class Client:
+    """
+    Client connecting to a :py:class:`Server` and emitting received events through :py:meth:`EventEmitter.emit_async`
+    of an *emitter*, one after another in the order they were published. Exceptions raised by listeners are passed to
+    the exception handler of the event loop. *serializer* must match the one of the server. The connection is closed
+    when receiving a frame larger than *max_frame_size* bytes or a message that cannot be decoded.
+    """
+
+    def __init__(self, emitter: EventEmitter, *, serializer: Any = None, max_frame_size: int = 1 << 26) -> None:
+        self.emitter = emitter
+        self.serializer = serializer or PickleSerializer()
+        self.max_frame_size = max_frame_size
+
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._task: asyncio.Task | None = None
+        self._acks: list[asyncio.Future] = []
+
+    async def __aenter__(self) -> Client:
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    @property
+    def connected(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def connect(self, path: str | None = None, *, host: str = "127.0.0.1", port: int | None = None) -> None:
+        """
+        Connects to a server listening on a Unix domain socket at *path*, or on *host* and *port* otherwise.
+        """
+        if self._task is not None:
+            raise RuntimeError("client already connected")
+
+        if path is not None:
+            self._reader, self._writer = await asyncio.open_unix_connection(path)
+        else:
+            self._reader, self._writer = await asyncio.open_connection(host, port)
+        self._task = asyncio.ensure_future(self._receive())
+
+    async def _receive(self) -> None:
+        # emit received events until the connection is closed
+        try:
+            while True:
+                data = await read_frame(self._reader, self.max_frame_size)  # type: ignore[arg-type]
+                # empty frames acknowledge requests
+                if not data:
+                    if self._acks:
+                        self._acks.pop(0).set_result(None)
+                    continue
+                try:
+                    kind, event, args, kwargs = self.serializer.loads(data)
+                    if kind != "event" or not isinstance(kwargs, dict):
+                        raise TypeError(f"malformed message of kind {kind!r}")
+                    args = tuple(args)
+                except Exception as e:
+                    raise ValueError("received message cannot be decoded") from e
+                try:
+                    await self.emitter.emit_async(event, *args, **kwargs)
+                except Exception as e:
+                    asyncio.get_running_loop().call_exception_handler(
+                        {
+                            "message": f"exception while emitting received event '{event}'",
+                            "exception": e,
+                        }
+                    )
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError:
+            # oversized frames and messages that cannot be decoded
+            if self._writer is not None:
+                self._writer.close()
+        finally:
+            for ack in self._acks:
+                ack.cancel()
+            del self._acks[:]
+
+    async def _request(self, action: str, patterns: tuple[str, ...]) -> None:
+        # sends a request and waits for its acknowledgement
+        if not self.connected:
+            raise RuntimeError("client not connected")
+
+        ack = asyncio.get_running_loop().create_future()
+        self._acks.append(ack)
+        data = control_serializer.dumps([action, list(patterns)])
+        self._writer.write(header.pack(len(data)) + data)  # type: ignore[union-attr]
+        await ack
+
+    async def subscribe(self, *patterns: str) -> None:
+        """
+        Subscribes to events matching *patterns* and returns once the server applied the subscription.
+        """
+        await self._request("subscribe", patterns)
+
+    async def unsubscribe(self, *patterns: str) -> None:
+        """
+        Removes subscriptions to *patterns* and returns once the server applied the change.
+        """
+        await self._request("unsubscribe", patterns)
+
+    async def wait_closed(self) -> None:
+        """
+        Waits until the connection was closed, e.g. by the server.
+        """
+        if self._task is not None:
+            await self._task
+
+    async def close(self) -> None:
+        """
+        Closes the connection.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._task is not None:
+            await self._task
+            self._task = None
@@ -11,3 +11,7 @@ sys.path.append(base)
 
 from pymitter import *  # noqa: E402, F403, I001
 from .test_all import *  # noqa: E402, F403, I001
+from .test_bench import *  # noqa: E402, F403, I001
+from .test_bridge import *  # noqa: E402, F403, I001
+from .test_transport import *  # noqa: E402, F403, I001
+from .test_journal import *  # noqa: E402, F403, I001
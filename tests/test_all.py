@@ -1,7 +1,30 @@
 import asyncio
+import concurrent.futures
+import itertools
+import threading
+import time
+import tracemalloc
 import unittest
+import weakref
+from unittest import mock
 
-from pymitter import EventEmitter
+import pytest
+
+from pymitter import (
+    EmitError,
+    EventEmitter,
+    EventHandle,
+    EventQueue,
+    Listener,
+    LoopRunner,
+    Namespace,
+    Subscription,
+    ThreadSafeEventEmitter,
+)
+
+
+def square(x):
+    return x * x
 
 
 class SyncTestCase(unittest.TestCase):
@@ -124,6 +147,75 @@ class SyncTestCase(unittest.TestCase):
         assert not hits("on_all.foo.bar", "on_all.*")
         assert not hits("on_all.*", "on_all.foo.bar")
 
+    def test_on_globstar(self):
+        def hits(handle: str, emit: str) -> bool:
+            ee = EventEmitter(wildcard=True)
+            stack = []
+            token = object()
+
+            @ee.on(handle)
+            def handler():
+                stack.append(token)
+
+            ee.emit(emit)
+            return tuple(stack) == (token,)
+
+        assert hits("orders.**", "orders")
+        assert hits("orders.**", "orders.new")
+        assert hits("orders.**", "orders.new.eu.fast")
+        assert hits("**", "orders.new")
+        assert hits("orders.**.done", "orders.done")
+        assert hits("orders.**.done", "orders.a.b.done")
+        assert hits("orders.**.done", "orders.*.done")
+        assert hits("orders.*.**", "orders.new.eu")
+
+        assert hits("orders", "orders.**")
+        assert hits("orders.new.eu", "orders.**")
+        assert hits("orders.new.eu.done", "**.done")
+        assert hits("orders.new.done", "orders.**.d?ne")
+        assert hits("orders.**.done", "orders.**")
+
+        assert not hits("orders.**", "users.new")
+        assert not hits("orders.**.done", "orders.a.b")
+        assert not hits("orders.*.**", "orders")
+        assert not hits("orders.new", "orders.**.done")
+
+    def test_globstar_nodes(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        @ee.on("a.**")
+        def handler1():
+            stack.append("a.**")
+
+        @ee.on("a.b.**")
+        def handler2():
+            stack.append("a.b.**")
+
+        @ee.on("a.b.c")
+        def handler3():
+            stack.append("a.b.c")
+
+        # listeners reached through multiple paths are called once
+        ee.emit("a.b.c")
+        assert tuple(stack) == ("a.**", "a.b.**", "a.b.c")
+
+        # subtree lookups
+        assert len(ee._event_tree.find_nodes("a.**")) == 5
+
+        # cache entries reaching globstar nodes are invalidated
+        del stack[:]
+        ee.off("a.**", handler1)
+        ee.emit("a.b.c")
+        assert tuple(stack) == ("a.b.**", "a.b.c")
+
+        # no globstar semantics without wildcards
+        ee = EventEmitter()
+        ee.on("a.**", handler1)
+        ee.emit("a.b")
+        assert ee.listeners("a.**") == [handler1]
+        assert ee.listeners("a.b") == []
+
     def test_on_any(self):
         ee = EventEmitter()
         stack = []
@@ -186,14 +278,111 @@ class SyncTestCase(unittest.TestCase):
 
         ee.off("foo.bar")
         assert ee.num_listeners == 1
-        assert len(nodes := ee._event_tree.find_nodes("foo.bar")) == 1
-        assert nodes[0].num_listeners() == 0
+        assert len(ee._event_tree.find_nodes("foo.bar")) == 0
 
         ee.on("foo.bar")(lambda: None)
         assert ee.num_listeners == 2
 
         ee.off("foo.*")
         assert ee.num_listeners == 0
+        assert not ee._event_tree.nodes
+
+    def test_off_event_no_prune(self):
+        ee = EventEmitter(wildcard=True, prune=False)
+
+        ee.on("foo.bar")(lambda: None)
+        ee.on("foo.baz")(lambda: None)
+
+        ee.off("foo.bar")
+        assert ee.num_listeners == 1
+        assert len(nodes := ee._event_tree.find_nodes("foo.bar")) == 1
+        assert nodes[0].num_listeners() == 0
+
+        assert ee.compact() == 1
+        assert len(ee._event_tree.find_nodes("foo.bar")) == 0
+
+        ee.off("foo.baz")
+        assert ee.compact() == 2
+        assert not ee._event_tree.nodes
+
+    def test_prune(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        def count_nodes():
+            return sum(1 for _ in ee._event_tree.walk_nodes())
+
+        ee.on("job.*.done", lambda: stack.append("any_job"))
+        assert count_nodes() == 3
+
+        # nodes of expired and removed listeners are pruned up to the first node with listeners
+        for i in range(10):
+            ee.once(f"job.{i}.done", lambda: stack.append("job"))
+        sub = ee.on("job.x.y.done", lambda: None, subscription=True)
+        assert count_nodes() == 3 + 10 * 2 + 3
+
+        for i in range(10):
+            ee.emit(f"job.{i}.done")
+        sub.off()
+        assert count_nodes() == 3
+        assert len(stack) == 20
+
+        # pattern nodes are removed as well
+        ee.off("job.*.done")
+        assert count_nodes() == 0
+        assert not ee._event_tree.pattern_nodes
+
+    def test_memory(self):
+        ee = EventEmitter()
+        n = 10000
+        events = [f"job.{i}.done" for i in range(n)]
+
+        def handler():
+            pass
+
+        # bytes per new event with two nodes and one listener, and per listener added to existing nodes
+        tracemalloc.start()
+        try:
+            size0 = tracemalloc.get_traced_memory()[0]
+            for event in events:
+                ee.on(event, handler)
+            size1 = tracemalloc.get_traced_memory()[0]
+            for event in events:
+                ee.on(event, handler)
+            size2 = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        per_listener = (size2 - size1) / n
+        per_node = (size1 - size0 - per_listener * n) / (2 * n)
+        assert per_listener < 256, f"{per_listener:.1f} bytes per listener"
+        assert per_node < 480, f"{per_node:.1f} bytes per node"
+
+    def test_prune_churn(self):
+        ee = EventEmitter(wildcard=True)
+        ee.on("job.**", lambda: None)
+
+        def churn(n):
+            for i in range(n):
+                event = f"job.{i:032x}.done"
+                sub = ee.on(event, lambda: None, subscription=True)
+                ee.once(event, lambda: None)
+                ee.emit(event)
+                sub.off()
+
+        # node counts and memory stay bounded
+        churn(1000)
+        tracemalloc.start()
+        try:
+            size = tracemalloc.get_traced_memory()[0]
+            churn(2000)
+            growth = tracemalloc.get_traced_memory()[0] - size
+        finally:
+            tracemalloc.stop()
+
+        assert sum(1 for _ in ee._event_tree.walk_nodes()) == 2
+        assert ee.num_listeners == 1
+        assert growth < 64 * 1024
 
     def test_listeners(self):
         ee = EventEmitter(wildcard=True)
@@ -224,6 +413,20 @@ class SyncTestCase(unittest.TestCase):
         assert tuple(ee.listeners("bar")) == (h3,)
         assert tuple(ee.listeners("ba?")) == (h3, h4)
 
+    def test_registration_order(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        # registration order does not depend on the clock resolution
+        with mock.patch("time.monotonic", return_value=0.0):
+            for i in range(5):
+                ee.on("foo.bar" if i % 2 else "foo.*", lambda i=i: stack.append(i))
+                ee.on_any(lambda i=i: stack.append(("any", i)))
+
+        ee.emit("foo.bar")
+        assert tuple(stack) == (0, ("any", 0), 1, ("any", 1), 2, ("any", 2), 3, ("any", 3), 4, ("any", 4))
+        assert len(ee.listeners_all()) == 10
+
     def test_emit_all(self):
         ee = EventEmitter(wildcard=True)
         stack = []
@@ -300,6 +503,76 @@ class SyncTestCase(unittest.TestCase):
         ee.emit("max")
         assert tuple(stack) == ("max_1",)
 
+    def test_max_event(self):
+        ee = EventEmitter()
+        stack = []
+        ee.set_max_listeners(1, "max")
+        assert ee.get_max_listeners("max") == 1
+        assert ee.get_max_listeners("other") == -1
+
+        ee.on("max", lambda: stack.append("max_1"))
+        ee.on("max", lambda: stack.append("max_2"))
+        ee.on("other", lambda: stack.append("other_1"))
+        ee.on("other", lambda: stack.append("other_2"))
+
+        ee.emit("max")
+        ee.emit("other")
+        assert tuple(stack) == ("max_1", "other_1", "other_2")
+
+        # removing the limit allows further listeners
+        ee.set_max_listeners(-1, "max")
+        ee.on("max", lambda: stack.append("max_3"))
+        assert len(ee.listeners("max")) == 2
+
+        # the total maximum can be set as well
+        ee.set_max_listeners(5)
+        assert ee.get_max_listeners() == 5
+        ee.on("max", lambda: stack.append("max_4"))
+        ee.on("max", lambda: stack.append("max_5"))
+        assert ee.num_listeners == 5
+
+    def test_num_listeners(self):
+        ee = EventEmitter(wildcard=True)
+
+        def handler():
+            pass
+
+        ee.on("foo.bar", handler)
+        ee.on("foo.bar", handler)
+        ee.on("foo.*", handler)
+        ee.once("foo.baz", handler)
+        ee.on_any(handler)
+        tree = ee._event_tree
+        assert ee.num_listeners == 5
+        assert tree.num_listeners() == 4
+        assert tree.nodes["foo"].num_listeners() == 4
+        assert tree.nodes["foo"].num_listeners(recursive=False) == 0
+
+        # ttl expiry
+        ee.emit("foo.baz")
+        assert ee.num_listeners == 4
+        assert tree.nodes["foo"].num_listeners() == 3
+
+        # removal by function and by event, with patterns matching both nodes
+        ee.off("foo.*", handler)
+        assert ee.num_listeners == 1
+        ee.on("foo.bar", handler)
+        ee.on("foo.*", handler)
+        ee.off("foo.bar")
+        assert ee.num_listeners == 1
+        assert tree.num_listeners() == 0
+
+        # subscriptions
+        sub = ee.on("foo.bar", handler, subscription=True)
+        assert ee.num_listeners == 2
+        sub.off()
+        assert ee.num_listeners == 1
+
+        ee.on("foo.bar", handler)
+        ee.off_all()
+        assert ee.num_listeners == 0
+        assert tree.num_listeners() == 0
+
     def test_tree(self):
         ee = EventEmitter()
         stack = []
@@ -330,8 +603,909 @@ class SyncTestCase(unittest.TestCase):
         ee.off("max", handler1)
         assert ee.num_listeners == 0
 
+    def test_pattern_nodes(self):
+        ee = EventEmitter(wildcard=True)
+        for i in range(100):
+            ee.on(f"foo.bar{i}", lambda: None)
+        ee.on("foo.bar1?", lambda: None)
+        ee.on("foo.*", lambda: None)
+
+        # only pattern names are tracked separately
+        foo = ee._event_tree.nodes["foo"]
+        assert len(foo.nodes) == 102
+        assert tuple(foo.pattern_nodes) == ("bar1?", "*")
+
+        # literal lookups hit the exact node and matching patterns
+        names = {node.name for node in ee._event_tree.find_nodes("foo.bar12")}
+        assert names == {"bar12", "bar1?", "*"}
+        names = {node.name for node in ee._event_tree.find_nodes("foo.bar2")}
+        assert names == {"bar2", "*"}
+
+        # pattern lookups are still compared to all nodes
+        assert len(ee._event_tree.find_nodes("foo.bar9?")) == 10
+
+        # without wildcards, patterns are plain names
+        ee = EventEmitter()
+        ee.on("foo.*", lambda: None)
+        assert not ee._event_tree.nodes["foo"].pattern_nodes
+        assert len(ee._event_tree.find_nodes("foo.bar")) == 0
+
+    def test_executor(self):
+        ee = EventEmitter()
+        stack = []
+        main_thread = threading.current_thread()
+        release = threading.Event()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+
+            @ee.on("foo", executor=executor)
+            def handler1(arg):
+                # blocking listeners do not stall others
+                release.wait(1)
+                stack.append(("handler1", threading.current_thread() is main_thread))
+                return arg
+
+            @ee.on("foo")
+            def handler2(arg):
+                stack.append(("handler2", threading.current_thread() is main_thread))
+                release.set()
+
+            futures = ee.emit("foo", 1)
+            assert len(futures) == 1
+            assert futures[0].result(1) == 1
+            assert tuple(stack) == (("handler2", True), ("handler1", False))
+
+            # async functions cannot be dispatched
+            async def handler3():  # noqa: RUF029
+                pass
+
+            with pytest.raises(ValueError, match="cannot dispatch async function"):
+                ee.on("foo", handler3, executor=executor)
+
+    def test_executor_default_ordered(self):
+        stack = []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            ee = EventEmitter(executor=executor, ordered=True)
+            for i in range(10):
+                ee.on("foo", lambda i=i: stack.append(i))
+            ee.once("foo", lambda: stack.append("once"))
+
+            futures = ee.emit("foo")
+            assert len(futures) == 1
+            concurrent.futures.wait(futures)
+            assert tuple(stack) == (*range(10), "once")
+
+            # ttl is applied when dispatching
+            del stack[:]
+            concurrent.futures.wait(ee.emit("foo"))
+            assert tuple(stack) == tuple(range(10))
+
+    def test_executor_process_pool(self):
+        ee = EventEmitter()
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            ee.on("foo", square, executor=executor)
+            futures = ee.emit("foo", 3)
+            assert futures[0].result(10) == 9
+
+    def test_emit_many(self):
+        ee = EventEmitter()
+        stack: list[tuple] = []
+
+        @ee.on("foo")
+        def handler1(arg, flag=False):
+            stack.append(("handler1", arg, flag))
+
+        @ee.on("foo", batch=True)
+        def handler2(batch):
+            stack.append(("handler2", tuple(args for args, _ in batch)))
+
+        @ee.on("foo", ttl=2)
+        def handler3(arg, flag=False):
+            stack.append(("handler3", arg, flag))
+
+        ee.emit_many("foo", [(1,), (2,), (3,)], flag=True)
+        assert tuple(stack) == (
+            ("handler1", 1, True),
+            ("handler3", 1, True),
+            ("handler1", 2, True),
+            ("handler3", 2, True),
+            ("handler1", 3, True),
+            ("handler2", ((1,), (2,), (3,))),
+        )
+        assert ee.listeners("foo") == [handler1, handler2]
+
+        # batch listeners receive a batch of one in normal emits
+        del stack[:]
+        ee.emit("foo", 4)
+        assert tuple(stack) == (("handler1", 4, False), ("handler2", ((4,),)))
+
+    def test_emit_many_changes(self):
+        ee = EventEmitter()
+        stack = []
+
+        @ee.once("foo")
+        def handler1(arg):
+            stack.append(("handler1", arg))
+
+        @ee.on("foo")
+        def handler2(arg):
+            stack.append(("handler2", arg))
+            if arg == 2:
+                ee.off("foo", handler3)
+                ee.on("foo", handler4)
+
+        @ee.on("foo")
+        def handler3(arg):
+            stack.append(("handler3", arg))
+
+        def handler4(arg):
+            stack.append(("handler4", arg))
+
+        ee.emit_many("foo", [(1,), (2,), (3,)])
+        assert tuple(stack) == (
+            ("handler1", 1),
+            ("handler2", 1),
+            ("handler3", 1),
+            ("handler2", 2),
+            ("handler3", 2),
+            ("handler2", 3),
+            ("handler4", 3),
+        )
+
+    def test_emit_batch(self):
+        ee = EventEmitter(wildcard=True)
+        stack: list[tuple] = []
+
+        @ee.on("foo.*")
+        def handler1(arg, **kwargs):
+            stack.append(("handler1", arg, kwargs))
+
+        @ee.on("foo.bar", batch=True)
+        def handler2(batch):
+            stack.append(("handler2", batch))
+
+        ee.emit_batch([("foo.bar", (1,)), ("foo.baz", (2,), {"x": 1}), ("foo.bar", (3,), {"y": 2})])
+        assert tuple(stack) == (
+            ("handler1", 1, {}),
+            ("handler1", 2, {"x": 1}),
+            ("handler1", 3, {"y": 2}),
+            ("handler2", [((1,), {}), ((3,), {"y": 2})]),
+        )
+
+    def test_error_policy(self):
+        def fail(arg):
+            stack.append(("fail", arg))
+            raise ValueError(arg)
+
+        def handler(arg):
+            stack.append(("handler", arg))
+
+        # raise by default, skipping remaining listeners
+        ee = EventEmitter()
+        stack: list[tuple] = []
+        ee.on("foo", fail)
+        ee.on("foo", handler)
+        with pytest.raises(ValueError, match="1"):
+            ee.emit("foo", 1)
+        assert tuple(stack) == (("fail", 1),)
+
+        # continue with error events
+        ee = EventEmitter(error_policy="continue")
+        stack = []
+        ee.on("foo", fail)
+        ee.on("foo", handler)
+        ee.on("error", lambda exc, event, func: stack.append(("error", str(exc), event, func)))
+        ee.emit("foo", 1)
+        assert tuple(stack) == (("fail", 1), ("error", "1", "foo", fail), ("handler", 1))
+
+        # exceptions of error listeners themselves are raised instead of being emitted again
+        ee.off_all()
+        ee.on("foo", fail)
+        ee.on("error", lambda exc, event, func: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            ee.emit("foo", 1)
+
+        # without any error listener, exceptions are raised as well
+        ee.off_all()
+        ee.on("foo", fail)
+        with pytest.raises(ValueError, match="1"):
+            ee.emit("foo", 1)
+
+        # continue with error handler
+        handled = []
+        ee = EventEmitter(error_policy="continue", error_handler=lambda *args: handled.append(args))
+        stack = []
+        ee.on("foo", fail)
+        ee.on("foo", handler)
+        ee.emit_many("foo", [(1,), (2,)])
+        assert tuple(stack) == (("fail", 1), ("handler", 1), ("fail", 2), ("handler", 2))
+        assert [(str(exc), event, func) for exc, event, func in handled] == [("1", "foo", fail), ("2", "foo", fail)]
+
+        # collect
+        ee = EventEmitter(error_policy="collect")
+        stack = []
+        ee.on("foo", fail)
+        ee.on("foo", handler)
+        ee.on("foo", fail)
+        with pytest.raises(EmitError) as ctx:
+            ee.emit("foo", 1)
+        assert tuple(stack) == (("fail", 1), ("handler", 1), ("fail", 1))
+        assert isinstance(ctx.value, Exception)
+        assert [str(exc) for exc in ctx.value.exceptions] == ["1", "1"]
+
+        del stack[:]
+        with pytest.raises(EmitError) as ctx:
+            ee.emit_batch([("foo", (1,)), ("foo", (2,))])
+        assert len(stack) == 6
+        assert len(ctx.value.exceptions) == 4
+
+        with pytest.raises(ValueError, match="unknown error policy"):
+            EventEmitter(error_policy="ignore")
+
+    def test_instrumentation(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        @ee.on("foo.*")
+        def handler(arg):
+            stack.append(arg)
+
+        @ee.on("foo.bar", batch=True)
+        def batch_handler(batch):
+            stack.append(len(batch))
+
+        # not instrumented by default
+        assert ee.stats() == {"events": {}, "listeners": []}
+        assert "_emit" not in ee.__dict__
+
+        inst = ee.instrument(
+            pre_dispatch=lambda event, args, kwargs: stack.append(("pre", event)),
+            post_dispatch=lambda event, args, kwargs, duration_ns: stack.append(("post", event, duration_ns >= 0)),
+        )
+        assert ee.instrumentation is inst
+
+        ee.emit("foo.bar", 1)
+        ee.emit_many("foo.baz", [(2,), (3,)])
+        ee.emit_batch([("foo.bar", (4,)), ("foo.baz", (5,))])
+        assert tuple(stack) == (
+            ("pre", "foo.bar"), 1, 1, ("post", "foo.bar", True),
+            ("pre", "foo.baz"), 2, ("post", "foo.baz", True),
+            ("pre", "foo.baz"), 3, ("post", "foo.baz", True),
+            ("pre", "foo.bar"), 4, ("post", "foo.bar", True),
+            ("pre", "foo.baz"), 5, ("post", "foo.baz", True),
+            1,
+        )  # fmt: skip
+
+        stats = ee.stats()
+        assert stats["events"]["foo.bar"]["count"] == 2
+        assert stats["events"]["foo.baz"]["count"] == 3
+        assert sum(stats["events"]["foo.baz"]["histogram"].values()) == 3
+        listeners = {entry["event"]: entry for entry in stats["listeners"]}
+        assert listeners["foo.*"]["count"] == 5
+        assert listeners["foo.bar"]["count"] == 2
+        assert listeners["foo.*"]["total_ns"] >= listeners["foo.*"]["max_ns"] > 0
+
+        inst.reset()
+        assert ee.stats() == {"events": {}, "listeners": []}
+
+        # disabling restores the default dispatch
+        assert ee.uninstrument() is inst
+        assert "_emit" not in ee.__dict__
+        assert "_call_listener" not in ee.__dict__
+        ee.emit("foo.bar", 6)
+        assert not inst.events
+        assert ee.stats() == {"events": {}, "listeners": []}
+
+        # without listener metrics
+        inst = ee.instrument(listeners=False)
+        ee.emit("foo.bar", 7)
+        assert ee.stats()["events"]["foo.bar"]["count"] == 1
+        assert not ee.stats()["listeners"]
+
+    def test_instrumentation_removed_listeners(self):
+        ee = EventEmitter()
+        inst = ee.instrument()
+        refs = []
+
+        class Handler:
+            def handle(self, arg):
+                pass
+
+        # metrics do not keep removed listeners and their functions alive
+        for i in range(100):
+            handler = Handler()
+            refs.append(weakref.ref(handler))
+            ee.once("foo", handler.handle)
+            ee.emit("foo", i)
+        del handler
+
+        assert ee.num_listeners == 0
+        assert len(inst.listeners) == 0
+        assert all(ref() is None for ref in refs)
+        assert inst.events["foo"].count == 100
+
+        handler = Handler()
+        ee.on("foo", handler.handle)
+        ee.emit("foo", 0)
+        assert len(inst.listeners) == 1
+        ee.off("foo", handler.handle)
+        assert len(inst.listeners) == 0
+
+        # metrics are dropped on removal, even when the listener is still referenced
+        subscription = ee.on("foo", handler.handle, subscription=True)
+        ee.emit("foo", 0)
+        assert len(inst.listeners) == 1
+        subscription.off()
+        assert len(inst.listeners) == 0
+
+        ee.on("foo", handler.handle)
+        ee.on_any(handler.handle)
+        ee.emit("foo", 0)
+        assert len(inst.listeners) == 2
+        ee.off_any(handler.handle)
+        assert len(inst.listeners) == 1
+        ee.off_all()
+        assert len(inst.listeners) == 0
+
+    def test_weak(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        class Handler:
+            def __init__(self, name):
+                self.name = name
+
+            def __call__(self, arg):
+                stack.append((self.name, arg))
+
+            def method(self, arg):
+                stack.append((self.name + "_method", arg))
+
+        h1, h2, h3 = Handler("h1"), Handler("h2"), Handler("h3")
+        ee.on("foo.bar", h1.method, weak=True)
+        ee.once("foo.bar", h2, weak=True)
+        ee.on_any(h3.method, weak=True)
+        ee.on("foo.*", h3, weak=True)
+        assert ee.num_listeners == 4
+        assert ee.listeners("foo.bar") == [h1.method, h2, h3]
+
+        ee.emit("foo.bar", 1)
+        assert tuple(stack) == (("h1_method", 1), ("h2", 1), ("h3_method", 1), ("h3", 1))
+        assert ee.num_listeners == 3
+
+        # weak listeners do not keep their objects alive and are removed once they are garbage collected
+        del h1
+        assert ee.num_listeners == 2
+        assert ee.listeners("foo.bar") == [h3]
+        del h3
+        assert ee.num_listeners == 0
+        assert not ee.listeners_all()
+        assert not ee._event_tree.nodes
+
+        # explicitly removed
+        h4 = Handler("h4")
+        ee.on("foo", h4.method, weak=True)
+        ee.off("foo", h4.method)
+        assert ee.num_listeners == 0
+        del h4
+
+    def test_weak_default(self):
+        ee = EventEmitter(weak=True)
+        stack = []
+
+        class Handler:
+            def method(self):
+                stack.append("method")
+
+        h = Handler()
+        ee.on("foo", h.method)
+        sub = ee.on("foo", Handler().method, weak=False, subscription=True)
+        ee.emit("foo")
+        assert tuple(stack) == ("method", "method")
+
+        del h
+        assert ee.listeners("foo") == [sub.func]
+        assert sub.active
+
+        # objects that cannot be weakly referenced
+        class Slotted:
+            __slots__ = ()
+
+            def __call__(self):
+                pass
+
+        with pytest.raises(TypeError):
+            ee.on("foo", Slotted())
+
+    def test_emit_collect(self):
+        ee = EventEmitter(wildcard=True)
+
+        ee.on("foo.bar", lambda arg: arg + 1)
+        ee.on("foo.*", lambda arg: arg * 2)
+        ee.on("foo.bar", lambda arg: None)
+        ee.once("foo.bar", lambda arg: "once")
+
+        async def handler(arg):
+            await asyncio.sleep(0.01)
+            return arg - 1
+
+        ee.on("foo.bar", handler)
+        assert ee.emit_collect("foo.bar", 3) == [4, 6, None, "once", 2]
+        assert ee.emit_collect("foo.bar", 3) == [4, 6, None, 2]
+        assert ee.emit_collect("bar") == []
+
+        # executors, ordered or not
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            for ordered in [False, True]:
+                ee = EventEmitter(executor=executor, ordered=ordered)
+                ee.on("foo", lambda arg: arg + 1)
+                ee.on("foo", lambda arg: arg + 2, executor=None)
+                ee.on("foo", handler)
+                assert ee.emit_collect("foo", 1) == [2, 3, 0]
+
+        # failed functions have no result
+        ee = EventEmitter(error_policy="continue", error_handler=lambda *args: None)
+        ee.on("foo", lambda: 1 / 0)
+        ee.on("foo", lambda: 1)
+        assert ee.emit_collect("foo") == [None, 1]
+
+        # awaited error events are not mistaken for results
+        async def on_error(exc, event, func):
+            await asyncio.sleep(0.01)
+            return "error"
+
+        ee = EventEmitter(error_policy="continue")
+        ee.on("error", on_error)
+        ee.on("foo", lambda: 1 / 0)
+        ee.on("foo", lambda: 1)
+        assert ee.emit_collect("foo") == [None, 1]
+
+    def test_emit_until(self):
+        ee = EventEmitter()
+        stack = []
+
+        def handler(arg):
+            stack.append(arg)
+            return arg
+
+        async def async_handler(arg):  # noqa: RUF029
+            stack.append(("async", arg))
+            return ("async", arg)
+
+        ee.on("foo", lambda arg: stack.append(None))
+        ee.on("foo", handler)
+        ee.on("foo", async_handler)
+
+        # stop at the first satisfactory result
+        assert ee.emit_first("foo", 1) == 1
+        assert tuple(stack) == (None, 1)
+
+        del stack[:]
+        assert ee.emit_until("foo", lambda res: isinstance(res, tuple), 2) == ("async", 2)
+        assert tuple(stack) == (None, 2, ("async", 2))
+
+        del stack[:]
+        assert ee.emit_until("foo", lambda res: False, 3) is None
+        assert len(stack) == 3
+
+        # expired listeners are not considered
+        ee = EventEmitter()
+        ee.once("foo", lambda: "once")
+        ee.on("foo", lambda: "on")
+        assert ee.emit_first("foo") == "once"
+        assert ee.emit_first("foo") == "on"
+
+        # executors
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            ee = EventEmitter(executor=executor, ordered=True)
+            ee.on("foo", lambda: None)
+            ee.on("foo", lambda: 1)
+            assert ee.emit_first("foo") == 1
+
+    def test_event_handle(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        ee.on("foo.bar", lambda arg: stack.append(("foo.bar", arg)))
+        handle = ee.event("foo.bar")
+        assert isinstance(handle, EventHandle)
+        assert handle.name == "foo.bar"
+
+        handle.emit(1)
+        assert tuple(stack) == (("foo.bar", 1),)
+
+        # listeners are only resolved again after changes
+        listeners = handle.listeners
+        handle.emit(2)
+        assert handle.listeners is listeners
+
+        @handle.on
+        def handler(arg):
+            stack.append(("handle", arg))
+
+        ee.on("foo.*", lambda arg: stack.append(("foo.*", arg)))
+        assert handle.listeners is not listeners
+        del stack[:]
+        handle.emit(3)
+        assert tuple(stack) == (("foo.bar", 3), ("handle", 3), ("foo.*", 3))
+
+        handle.off(handler)
+        ee.once("foo.bar", lambda arg: stack.append(("once", arg)))
+        del stack[:]
+        handle.emit(4)
+        handle.emit(5)
+        assert tuple(stack) == (("foo.bar", 4), ("foo.*", 4), ("once", 4), ("foo.bar", 5), ("foo.*", 5))
+
+        ee.off_all()
+        del stack[:]
+        handle.emit(6)
+        assert stack == []
+
+    def test_namespace(self):
+        ee = EventEmitter(wildcard=True, delimiter=":")
+        stack = []
+
+        orders = ee.namespace("orders")
+        assert isinstance(orders, Namespace)
+
+        @orders.on("created")
+        def handler(arg):
+            stack.append(("created", arg))
+
+        orders.once("*", lambda arg: stack.append(("*", arg)))
+        assert handler in ee.listeners("orders:created")
+
+        orders.emit("created", 1)
+        ee.emit("orders:created", 2)
+        orders.event("created").emit(3)
+        assert tuple(stack) == (("created", 1), ("*", 1), ("created", 2), ("created", 3))
+
+        # nested namespaces
+        items = orders.namespace("items")
+        items.on("added", lambda arg: stack.append(("added", arg)))
+        del stack[:]
+        ee.emit("orders:items:added", 4)
+        assert tuple(stack) == (("added", 4),)
+
+        orders.off("created", handler)
+        assert orders.listeners("created") == []
+
+    def test_compiled(self):
+        ee = EventEmitter(wildcard=True, compiled=True)
+        stack: list[tuple | str] = []
+
+        def handler(arg):
+            stack.append(("on", arg))
+
+        async def async_handler(arg):  # noqa: RUF029
+            stack.append(("async", arg))
+
+        ee.on("foo.bar", handler)
+        ee.once("foo.*", lambda arg: stack.append(("once", arg)))
+        ee.on("foo.bar", async_handler)
+        ee.on("foo.bar", lambda items: stack.append(("batch", len(items))), batch=True)
+
+        ee.emit("foo.bar", 1)
+        assert tuple(stack) == (("on", 1), ("once", 1), ("batch", 1), ("async", 1))
+
+        # expired listeners drop the dispatcher, which is generated again on the next emit
+        assert "foo.bar" not in ee._dispatchers
+        del stack[:]
+        ee.emit_many("foo.bar", [(2,), (3,)])
+        assert tuple(stack) == (("on", 2), ("on", 3), ("batch", 2), ("async", 2), ("async", 3))
+        dispatcher = ee._dispatchers["foo.bar"][3]
+        ee.emit("foo.bar", 4)
+        assert ee._dispatchers["foo.bar"][3] is dispatcher
+
+        # executors
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            ee.executor = executor
+            del stack[:]
+            futures = ee.emit("foo.bar", 5)
+            concurrent.futures.wait(futures)
+            assert sorted(stack, key=str) == sorted([("on", 5), ("async", 5), ("batch", 1)], key=str)
+            ee.executor = None
+
+        # removed listeners are not kept alive by dispatchers
+        ref = weakref.ref(handler)
+        ee.off("foo.bar", handler)
+        del handler, dispatcher
+        assert ref() is None
+        ee.emit("foo.bar", 6)
+        assert "foo.bar" in ee._dispatchers
+        ee.off_all()
+        assert not ee._dispatchers
+
+        # error policies
+        ee = EventEmitter(compiled=True, error_policy="collect")
+        ee.on("foo", lambda: 1 / 0)
+        ee.on("foo", lambda: stack.append("called"))
+        del stack[:]
+        with pytest.raises(EmitError):
+            ee.emit("foo")
+        assert tuple(stack) == ("called",)
+
+        ee.error_policy = "raise"
+        del stack[:]
+        with pytest.raises(ZeroDivisionError):
+            ee.emit("foo")
+        assert stack == []
+
+        # weak listeners
+        class Handler:
+            def __call__(self):
+                stack.append("weak")
+
+        ee = EventEmitter(compiled=True)
+        obj = Handler()
+        ee.on("foo", obj, weak=True)
+        del stack[:]
+        ee.emit("foo")
+        del obj
+        ee.emit("foo")
+        assert tuple(stack) == ("weak",)
+
+    def test_subscription(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        def handler(arg):
+            stack.append(arg)
+
+        sub1 = ee.on("foo.bar", handler, subscription=True)
+        sub2 = ee.on("foo.*", handler, subscription=True)
+        assert isinstance(sub1, Subscription)
+        assert (sub1.event, sub1.func) == ("foo.bar", handler)
+        assert (sub1.active, sub2.active) == (True, True)
+
+        ee.emit("foo.bar", 1)
+        assert tuple(stack) == (1, 1)
+
+        # remove exactly one registration
+        assert sub1.off()
+        assert not sub1.active
+        assert not sub1.off()
+        ee.emit("foo.bar", 2)
+        assert tuple(stack) == (1, 1, 2)
+        assert ee.num_listeners == 1
+
+        # decorator usage and any listeners
+        @ee.on_any(subscription=True)
+        def sub3(arg):
+            stack.append(("any", arg))
+
+        assert isinstance(sub3, Subscription)
+        assert sub3.off()
+        assert ee.listeners_any() == []
+
+        # detached by removing all listeners
+        ee.off_all()
+        assert not sub2.active
+
+    def test_subscription_once(self):
+        ee = EventEmitter()
+        stack = []
+
+        def handler(arg):
+            stack.append(arg)
+
+        # expiring a listener only removes this very registration
+        sub1 = ee.once("foo", handler, subscription=True)
+        sub2 = ee.on("foo", handler, subscription=True)
+        ee.emit("foo", 1)
+        ee.emit("foo", 2)
+        assert tuple(stack) == (1, 1, 2)
+        assert not sub1.active
+        assert sub2.active
+
+    def test_dispatch_cache(self):
+        ee = EventEmitter(wildcard=True)
+        stack = []
+
+        @ee.on("foo.bar")
+        def handler1():
+            stack.append("foo.bar")
+
+        ee.emit("foo.bar")
+        ee.emit("foo.baz")
+        assert tuple(ee._dispatch_cache) == ("foo.bar", "foo.baz")
+        entry = ee._dispatch_cache["foo.bar"]
+
+        # registering to an unrelated event keeps the entry
+        ee.on("other", lambda: None)
+        assert ee._dispatch_cache["foo.bar"] is entry
+
+        # registering to a matching pattern only drops affected entries
+        @ee.on("foo.ba?")
+        def handler2():
+            stack.append("foo.ba?")
+
+        assert tuple(ee._dispatch_cache) == ()
+        ee.emit("foo.bar")
+        ee.emit("other")
+        assert tuple(stack) == ("foo.bar", "foo.bar", "foo.ba?")
+
+        # removal
+        ee.off("foo.bar", handler1)
+        assert tuple(ee._dispatch_cache) == ("other",)
+        del stack[:]
+        ee.emit("foo.bar")
+        assert tuple(stack) == ("foo.ba?",)
+
+        # any listeners affect all entries
+        ee.on_any(handler1)
+        assert tuple(ee._dispatch_cache) == ()
+        ee.emit("other")
+        ee.off_any(handler1)
+        assert tuple(ee._dispatch_cache) == ()
+
+    def test_dispatch_cache_ttl(self):
+        ee = EventEmitter()
+        stack = []
+
+        @ee.once("foo")
+        def handler():
+            stack.append("foo")
+
+        ee.emit("foo")
+        ee.emit("foo")
+        assert tuple(stack) == ("foo",)
+        assert ee._dispatch_cache["foo"] == ()
+
+    def test_dispatch_cache_size(self):
+        ee = EventEmitter(cache_size=2)
+        ee.emit("a")
+        ee.emit("b")
+        ee.emit("a")
+        ee.emit("c")
+        assert tuple(ee._dispatch_cache) == ("a", "c")
+
+        ee = EventEmitter(cache_size=0)
+        ee.emit("a")
+        assert len(ee._dispatch_cache) == 0
+
 
 class AsyncTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_error_policy_async(self):
+        stack: list[tuple] = []
+
+        async def fail(arg):  # noqa: RUF029
+            stack.append(("fail", arg))
+            raise ValueError(arg)
+
+        async def handler(arg):  # noqa: RUF029
+            stack.append(("handler", arg))
+
+        async def on_error(exc, event, func):  # noqa: RUF029
+            stack.append(("error", str(exc), event, func))
+
+        # continue with error events
+        ee = EventEmitter(error_policy="continue")
+        ee.on("foo", fail)
+        ee.on("foo", handler)
+        ee.on("error", on_error)
+        await ee.emit_async("foo", 1)
+        assert sorted(stack, key=str) == sorted(
+            [("fail", 1), ("handler", 1), ("error", "1", "foo", fail)],
+            key=str,
+        )
+
+        # exceptions of error listeners themselves are raised instead of being emitted again
+        async def fail_error(exc, event, func):  # noqa: RUF029
+            raise ZeroDivisionError
+
+        ee.off("error", on_error)
+        ee.on("error", fail_error)
+        with pytest.raises(ZeroDivisionError):
+            await asyncio.wait_for(ee.emit_async("foo", 1), 5)
+
+        # without any error listener, exceptions are raised as well
+        ee.off("error")
+        with pytest.raises(ValueError, match="1"):
+            await asyncio.wait_for(ee.emit_async("foo", 1), 5)
+
+        # collect
+        ee = EventEmitter(error_policy="collect")
+        ee.on("foo", fail)
+        ee.on("foo", handler)
+        ee.on("foo", lambda arg: 1 / 0)
+        del stack[:]
+        with pytest.raises(EmitError) as ctx:
+            await ee.emit_many_async("foo", [(1,), (2,)])
+        assert len(stack) == 4
+        assert sorted(type(exc).__name__ for exc in ctx.value.exceptions) == [
+            "ValueError",
+            "ValueError",
+            "ZeroDivisionError",
+            "ZeroDivisionError",
+        ]
+
+    def test_error_policy_sync_emit(self):
+        ee = EventEmitter(error_policy="collect")
+        stack = []
+
+        async def fail():  # noqa: RUF029
+            stack.append("fail")
+            raise ValueError
+
+        async def handler():  # noqa: RUF029
+            stack.append("handler")
+
+        ee.on("foo", fail)
+        ee.on("foo", handler)
+        with pytest.raises(EmitError):
+            ee.emit("foo")
+        assert tuple(stack) == ("fail", "handler")
+
+    async def test_emit_async_collect(self):
+        ee = EventEmitter()
+
+        async def handler(arg):
+            await asyncio.sleep(0.01)
+            return arg - 1
+
+        ee.on("foo", lambda arg: arg + 1)
+        ee.on("foo", handler)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            ee.on("foo", lambda arg: arg * 2, executor=executor)
+            assert await ee.emit_async_collect("foo", 3) == [4, 2, 6]
+
+        # sync collect within the loop of the runner cannot wait
+        with LoopRunner() as runner:
+            ee = EventEmitter(runner=runner)
+            ee.on("foo", lambda arg: arg + 1)
+            ee.on("foo", handler)
+
+            async def collect():  # noqa: RUF029
+                return ee.emit_collect("foo", 3)
+
+            future = asyncio.run_coroutine_threadsafe(collect(), runner.loop)
+            with pytest.raises(RuntimeError):
+                future.result()
+            assert ee.emit_collect("foo", 3) == [4, 2]
+
+    async def test_event_handle_async(self):
+        ee = EventEmitter()
+        stack = []
+
+        async def handler(arg):  # noqa: RUF029
+            stack.append(arg)
+
+        handle = ee.namespace("foo").event("bar")
+        handle.on(handler)
+        await handle.emit_async(1)
+        await ee.namespace("foo").emit_async("bar", 2)
+        assert tuple(stack) == (1, 2)
+
+    async def test_emit_until_async(self):
+        ee = EventEmitter()
+        stack: list[int | str] = []
+
+        async def handler(arg):  # noqa: RUF029
+            stack.append(arg)
+            return arg or None
+
+        def sync_handler(arg):
+            stack.append("sync")
+            return "sync"
+
+        ee.on("foo", handler)
+        ee.on("foo", sync_handler)
+        ee.on("foo", handler)
+
+        assert await ee.emit_first_async("foo", 1) == 1
+        assert tuple(stack) == (1,)
+
+        del stack[:]
+        assert await ee.emit_first_async("foo", 0) == "sync"
+        assert tuple(stack) == (0, "sync")
+
+        del stack[:]
+        assert await ee.emit_until_async("foo", lambda res: res == 2, 1) is None
+        assert tuple(stack) == (1, "sync", 1)
+
     def test_async_callback_usage(self):
         ee = EventEmitter()
         stack = []
@@ -403,6 +1577,143 @@ class AsyncTestCase(unittest.IsolatedAsyncioTestCase):
 
         await test()
 
+    def test_listener_kind(self):
+        class AsyncCallable:
+            async def __call__(self):
+                pass
+
+        async def coro():  # noqa: RUF029
+            pass
+
+        assert Listener(lambda: None, "event", -1).kind == Listener.SYNC
+        assert Listener(coro, "event", -1).kind == Listener.COROUTINE
+        assert Listener(AsyncCallable(), "event", -1).kind == Listener.ASYNC_CALLABLE
+        assert not hasattr(Listener(coro, "event", -1), "__dict__")
+
+    async def test_executor_emit_async(self):
+        stack = []
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            ee = EventEmitter(executor=executor)
+
+            @ee.on("foo")
+            def handler1(arg):
+                stack.append(("handler1", arg))
+
+            @ee.on("foo")
+            async def handler2(arg):  # noqa: RUF029
+                stack.append(("handler2", arg))
+
+            await ee.emit_async("foo", 1)
+            assert set(stack) == {("handler1", 1), ("handler2", 1)}
+
+            del stack[:]
+            ee.emit_future("foo", 2)
+            for _ in range(100):
+                if len(stack) == 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert set(stack) == {("handler1", 2), ("handler2", 2)}
+
+    async def test_emit_many_async(self):
+        ee = EventEmitter()
+        stack = []
+
+        @ee.on("foo")
+        async def handler1(arg):  # noqa: RUF029
+            stack.append(("handler1", arg))
+
+        @ee.on("foo", batch=True)
+        async def handler2(batch):  # noqa: RUF029
+            stack.append(("handler2", len(batch)))
+
+        await ee.emit_many_async("foo", [(1,), (2,)])
+        assert tuple(stack) == (("handler1", 1), ("handler1", 2), ("handler2", 2))
+
+        del stack[:]
+        await ee.emit_batch_async([("foo", (3,)), ("bar", (4,))])
+        assert tuple(stack) == (("handler1", 3), ("handler2", 1))
+
+    async def test_queue(self):
+        ee = EventEmitter()
+        stack = []
+        release = asyncio.Event()
+
+        @ee.on("foo")
+        async def handler(arg):
+            await release.wait()
+            stack.append(arg)
+
+        async with ee.queue(maxsize=2, workers=1) as queue:
+            # one event is taken by the worker, two more fill the queue
+            for i in range(3):
+                await queue.emit("foo", i)
+                await asyncio.sleep(0)
+            assert queue.qsize() == 2
+
+            # emitting applies backpressure
+            task = asyncio.ensure_future(queue.emit("foo", 3))
+            await asyncio.sleep(0.01)
+            assert not task.done()
+
+            release.set()
+            await task
+            await queue.join()
+            assert tuple(stack) == (0, 1, 2, 3)
+
+        assert not queue.running
+
+    async def test_queue_nowait(self):
+        ee = EventEmitter()
+        stack = []
+
+        @ee.on("foo")
+        def handler(arg):
+            stack.append(arg)
+
+        for policy, expected in [("drop", (0, 1)), ("drop_oldest", (1, 2))]:
+            del stack[:]
+            queue = EventQueue(ee, maxsize=2, policy=policy)
+            assert queue.emit_nowait("foo", 0)
+            assert queue.emit_nowait("foo", 1)
+            assert queue.emit_nowait("foo", 2) == (policy == "drop_oldest")
+            assert queue.dropped == 1
+            await queue.stop()
+            assert tuple(stack) == expected
+
+        queue = EventQueue(ee, maxsize=1)
+        queue.emit_nowait("foo", 0)
+        with pytest.raises(asyncio.QueueFull):
+            queue.emit_nowait("foo", 1)
+
+        # stopping without draining discards queued events
+        del stack[:]
+        await queue.stop(drain=False)
+        assert tuple(stack) == ()
+
+        with pytest.raises(ValueError, match="unknown policy"):
+            EventQueue(ee, policy="block")
+
+    async def test_queue_errors(self):
+        ee = EventEmitter()
+        stack = []
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context["exception"]))
+
+        @ee.on("foo")
+        def handler(arg):
+            if arg == 0:
+                raise ValueError(arg)
+            stack.append(arg)
+
+        async with ee.queue() as queue:
+            await queue.emit("foo", 0)
+            await queue.emit("foo", 1)
+
+        assert tuple(stack) == (1,)
+        assert len(errors) == 1
+        assert isinstance(errors[0], ValueError)
+
     def test_supports_async_callables(self):
         ee = EventEmitter()
         stack = []
@@ -415,3 +1726,195 @@ class AsyncTestCase(unittest.IsolatedAsyncioTestCase):
 
         ee.emit("event", "arg")
         assert tuple(stack) == ("arg",)
+
+
+class LoopRunnerTestCase(unittest.TestCase):
+    def test_runner_emit(self):
+        with LoopRunner() as runner:
+            ee = EventEmitter(runner=runner)
+            stack = []
+
+            @ee.on("foo")
+            async def handler(arg):  # noqa: RUF029
+                stack.append((arg, threading.current_thread().name))
+
+            # the same loop is used across emits and emit blocks until handlers are done
+            loop = runner.loop
+            ee.emit("foo", 1)
+            ee.emit("foo", 2)
+            assert runner.loop is loop
+            assert tuple(stack) == ((1, runner.name), (2, runner.name))
+
+        assert not runner.running
+
+    def test_runner_emit_threadsafe(self):
+        runner = LoopRunner()
+        ee = EventEmitter(runner=runner)
+        started = threading.Event()
+
+        @ee.on("foo")
+        async def handler(arg):
+            started.set()
+            await asyncio.sleep(0.01)
+            return arg * 2
+
+        future = ee.emit_threadsafe("foo", 2)
+        assert started.wait(1)
+        assert future.result(1) == [4]
+
+        # without async listeners, the future is resolved immediately
+        assert ee.emit_threadsafe("bar").result() == []
+
+        # pending tasks are awaited on stop
+        future = ee.emit_threadsafe("foo", 3)
+        runner.stop()
+        assert future.done()
+        assert future.result() == [6]
+
+        # without runner
+        with pytest.raises(RuntimeError):
+            EventEmitter().emit_threadsafe("foo")
+
+    def test_runner_nested_emit(self):
+        with LoopRunner() as runner:
+            ee = EventEmitter(runner=runner)
+            stack = []
+
+            @ee.on("outer")
+            async def outer():
+                # emitting from within the loop does not block
+                ee.emit("inner")
+                stack.append("outer")
+                await asyncio.sleep(0)
+
+            @ee.on("inner")
+            async def inner():  # noqa: RUF029
+                stack.append("inner")
+
+            ee.emit("outer")
+            assert tuple(stack) == ("outer", "inner")
+
+
+class ThreadSafeTestCase(unittest.TestCase):
+    def test_thread_safe_usage(self):
+        ee = ThreadSafeEventEmitter(wildcard=True, new_listener=True)
+        stack = []
+
+        @ee.on("new_listener")
+        def on_new(func, event=None):
+            stack.append(("new", event))
+
+        @ee.on("foo.*")
+        def handler(arg):
+            stack.append(arg)
+
+        ee.once("foo.bar", handler)
+        ee.on_any(handler)
+
+        ee.emit("foo.bar", 1)
+        ee.emit("foo.bar", 2)
+        assert tuple(stack) == (("new", "foo.*"), ("new", "foo.bar"), ("new", None), 1, 1, 1, 2, 2)
+        assert ee.listeners("foo.baz") == [handler]
+        assert ee.listeners_any() == [handler]
+        assert len(ee.listeners_all()) == 3
+
+        ee.off("foo.*", handler)
+        ee.off_any(handler)
+        assert ee.num_listeners == 1
+        ee.off_all()
+        assert ee.num_listeners == 0
+        del stack[:]
+        ee.emit("foo.bar", 3)
+        assert not stack
+
+    def test_thread_safe_lock_free_emit(self):
+        ee = ThreadSafeEventEmitter()
+        stack: list[int] = []
+        ee.on("foo", stack.append)
+        ee.emit("foo", 1)
+
+        # cached events are emitted while the lock is held by another thread
+        with ee._lock:
+            thread = threading.Thread(target=ee.emit, args=("foo", 2))
+            thread.start()
+            thread.join(5)
+            assert not thread.is_alive()
+        assert tuple(stack) == (1, 2)
+
+    def test_thread_safe_stress(self):
+        ee = ThreadSafeEventEmitter(wildcard=True, cache_size=8)
+        stop = threading.Event()
+        errors = []
+
+        def handler(*args):
+            pass
+
+        def run(func):
+            def target():
+                try:
+                    while not stop.is_set():
+                        func()
+                except Exception as e:
+                    errors.append(e)
+
+            return threading.Thread(target=target)
+
+        counter = itertools.count()
+
+        def register():
+            n = next(counter)
+            event = f"job.{n % 16}.done"
+            sub = ee.on(event, handler, subscription=True)
+            ee.once(event, handler)
+            ee.on_any(handler)
+            ee.emit(event)
+            sub.off()
+            ee.off_any(handler)
+            if n % 10 == 0:
+                ee.off("job.*.done")
+
+        def emit():
+            ee.emit(f"job.{next(counter) % 16}.done", 1)
+            ee.emit_many("job.*.done", [(1,), (2,)])
+
+        threads = [run(register) for _ in range(4)] + [run(emit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.5)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert not errors
+        ee.off("job.**")
+        ee.off_any(handler)
+        assert ee.num_listeners == 0
+        assert ee._event_tree.count == 0
+        assert not ee._event_tree.nodes
+        assert not ee.listeners_all()
+
+    def test_thread_safe_ttl(self):
+        ee = ThreadSafeEventEmitter()
+        stack = []
+        n_threads = 8
+
+        for i in range(50):
+            ee.once("foo", lambda i=i: stack.append(("once", i)))
+            ee.on("foo", lambda i=i: stack.append(("ttl", i)), ttl=3)
+
+        # listeners with a ttl are called exactly ttl times across concurrent emits, and removed afterwards
+        barrier = threading.Barrier(n_threads)
+
+        def emit():
+            barrier.wait()
+            for _ in range(5):
+                ee.emit("foo")
+
+        threads = [threading.Thread(target=emit) for _ in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(stack) == sorted([("once", i) for i in range(50)] + [("ttl", i) for i in range(50)] * 3)
+        assert ee.num_listeners == 0
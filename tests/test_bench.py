@@ -0,0 +1,44 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from pymitter import bench
+
+
+class BenchTestCase(unittest.TestCase):
+    def test_run(self):
+        stack: list[dict] = []
+        results = bench.run("emit_literal", repeat=2, min_time=0.001, callback=stack.append)
+
+        assert len(results) == 1
+        assert stack == results
+        result = results[0]
+        assert result["name"] == "emit_literal"
+        assert result["ops"] == 1
+        assert len(result["times_ns"]) == 2
+        assert 0 < result["min_ns"] <= result["median_ns"]
+
+        assert bench.run("unknown_*") == []
+
+    def test_main_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "results.json")
+            with contextlib.redirect_stdout(io.StringIO()) as stdout:
+                bench.main(["--filter", "subscribe", "--repeat", "1", "--min-time", "0.001", "--json", path])
+
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+
+        assert "subscribe" in stdout.getvalue()
+        assert data["pymitter"]
+        assert [result["name"] for result in data["results"]] == ["subscribe"]
+
+    def test_main_list(self):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            bench.main(["--list"])
+
+        names = [line.split()[0] for line in stdout.getvalue().splitlines()]
+        assert names == list(bench.benchmarks)
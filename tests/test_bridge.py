@@ -0,0 +1,207 @@
+import multiprocessing
+import pickle
+import time
+import unittest
+
+from pymitter import EventEmitter
+from pymitter.bridge import Bridge
+
+
+def worker(conn):
+    # answers each ping event with a pong event
+    ee = EventEmitter()
+    with Bridge(ee, [conn], patterns=["pong"], batch_size=1) as bridge:
+        done = []
+
+        @ee.on("ping")
+        def ping(arg):
+            bridge.emit("pong", arg * 2)
+
+        ee.on("stop", lambda: done.append(True))
+        while not done:
+            bridge.poll(None)
+
+
+class BridgeTestCase(unittest.TestCase):
+    def test_forward(self):
+        conn1, conn2 = multiprocessing.Pipe()
+        ee1, ee2 = EventEmitter(), EventEmitter(wildcard=True)
+        stack = []
+
+        ee1.on("foo.bar", lambda arg: stack.append(("local", arg)))
+        ee2.on("foo.*", lambda arg: stack.append(("remote", arg)))
+        ee2.on("baz", lambda arg: stack.append(("remote", arg)))
+
+        with Bridge(ee1, [conn1], patterns=["foo.*"], batch_size=3) as bridge1, Bridge(ee2, [conn2]) as bridge2:
+            assert bridge1.matches("foo.bar")
+            assert not bridge1.matches("baz")
+
+            # local delivery is immediate, forwarding is batched
+            bridge1.emit("foo.bar", 1)
+            assert bridge1.emit("baz", 2) == []
+            ee1.emit("foo.bar", 3)
+            assert tuple(stack) == (("local", 1), ("local", 3))
+            assert bridge2.poll() == 0
+
+            assert bridge1.forward("foo.bar", 4)
+            assert not bridge1.forward("baz", 5)
+            assert bridge1.flush() == 2
+            assert bridge2.poll(1.0) == 1
+            assert tuple(stack[2:]) == (("remote", 1), ("remote", 4))
+
+            # full batches are sent right away
+            del stack[:]
+            for i in range(3):
+                bridge1.forward("foo.baz", i)
+            assert bridge2.poll(1.0) == 1
+            assert tuple(stack) == (("remote", 0), ("remote", 1), ("remote", 2))
+
+            # received events are not forwarded back
+            bridge2.emit("foo.bar", 6)
+            bridge2.flush()
+            del stack[:]
+            assert bridge1.poll(1.0) == 1
+            assert tuple(stack) == (("local", 6),)
+            bridge1.flush()
+            assert bridge2.poll() == 0
+
+        assert bridge1.connections == []
+
+    def test_out_of_band(self):
+        conn1, conn2 = multiprocessing.Pipe()
+        ee = EventEmitter()
+        stack = []
+        ee.on("data", lambda small, large, key=None: stack.append((small, large, key)))
+
+        with Bridge(EventEmitter(), [conn1], buffer_size=1024) as bridge1, Bridge(ee, [conn2]) as bridge2:
+            large = bytearray(b"x" * 100000)
+            bridge1.forward("data", bytearray(b"small"), pickle.PickleBuffer(large), key=large)
+            bridge1.flush()
+
+            # the message is followed by the two large buffers
+            assert conn2.poll(1.0)
+            assert bridge2.poll(1.0) == 1
+            small, large2, key = stack[0]
+            assert small == bytearray(b"small")
+            assert bytes(large2) == bytes(large)
+            assert key == large
+
+    def test_relay(self):
+        hub_conns, worker_conns = zip(*(multiprocessing.Pipe() for _ in range(3)))
+        stack: list[tuple] = []
+
+        hub = Bridge(EventEmitter(), hub_conns, relay=True)
+        bridges = []
+        for i, conn in enumerate(worker_conns):
+            ee = EventEmitter()
+            ee.on("foo", lambda arg, i=i: stack.append((i, arg)))
+            bridges.append(Bridge(ee, [conn]))
+
+        bridges[0].emit("foo", 1)
+        bridges[0].flush()
+        assert hub.poll(1.0) == 1
+        for bridge in bridges:
+            bridge.poll(0.1)
+        assert sorted(stack) == [(0, 1), (1, 1), (2, 1)]
+
+        # closed connections are removed
+        bridges[2].close()
+        hub.emit("foo", 2)
+        hub.flush()
+        hub.poll(0.1)
+        assert len(hub.connections) == 2
+
+        hub.close()
+        for bridge in bridges:
+            bridge.close()
+
+    def test_thread(self):
+        conn1, conn2 = multiprocessing.Pipe()
+        stack: list[int] = []
+        ee = EventEmitter()
+        ee.on("foo", stack.append)
+
+        with Bridge(EventEmitter(), [conn1], interval=0.001) as bridge1, Bridge(ee, [conn2], interval=0.001) as bridge2:
+            bridge1.start()
+            bridge2.start()
+            for i in range(10):
+                bridge1.emit("foo", i)
+
+            deadline = time.monotonic() + 5
+            while len(stack) < 10 and time.monotonic() < deadline:
+                time.sleep(0.001)
+        assert stack == list(range(10))
+
+    def test_large_messages(self):
+        # both sides send more data than the pipe buffers without blocking each other
+        conn1, conn2 = multiprocessing.Pipe()
+        ee1, ee2 = EventEmitter(), EventEmitter()
+        stack1: list[int] = []
+        stack2: list[int] = []
+        ee1.on("data", lambda data: stack1.append(len(data)))
+        ee2.on("data", lambda data: stack2.append(len(data)))
+
+        with Bridge(ee1, [conn1]) as bridge1, Bridge(ee2, [conn2]) as bridge2:
+            # both background threads flush their batches at the same time
+            for _ in range(20):
+                bridge1.forward("data", bytearray(1 << 20))
+                bridge2.forward("data", bytearray(1 << 20))
+            bridge1.start()
+            bridge2.start()
+
+            deadline = time.monotonic() + 10
+            while (len(stack1) < 20 or len(stack2) < 20) and time.monotonic() < deadline:
+                time.sleep(0.001)
+        assert stack1 == stack2 == [1 << 20] * 20
+
+    def test_listener_exception(self):
+        conn1, conn2 = multiprocessing.Pipe()
+        stack: list[int] = []
+        errors: list[Exception] = []
+        ee = EventEmitter()
+
+        @ee.on("foo")
+        def raise_os_error(arg):
+            if arg == 0:
+                raise OSError("listener failed")
+
+        ee.on("foo", stack.append)
+
+        with Bridge(EventEmitter(), [conn1]) as bridge1, Bridge(ee, [conn2], error_handler=errors.append) as bridge2:
+            bridge2.start()
+            bridge1.emit("foo", 0)
+            bridge1.flush()
+            bridge1.emit("foo", 1)
+            bridge1.flush()
+
+            deadline = time.monotonic() + 5
+            while not stack and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+            # the connection and the background thread survive errors of listeners
+            assert stack == [1]
+            assert isinstance(errors[0], OSError)
+            assert bridge2.connections == [conn2]
+            assert bridge2._thread is not None
+            assert bridge2._thread.is_alive()
+
+    def test_process(self):
+        conn, child_conn = multiprocessing.Pipe()
+        process = multiprocessing.Process(target=worker, args=(child_conn,), daemon=True)
+        process.start()
+        child_conn.close()
+
+        stack: list[int] = []
+        ee = EventEmitter()
+        ee.on("pong", stack.append)
+        with Bridge(ee, [conn], patterns=["ping", "stop"]) as bridge:
+            for i in range(5):
+                bridge.forward("ping", i)
+            bridge.flush()
+            while len(stack) < 5:
+                bridge.poll(5.0)
+            bridge.forward("stop")
+
+        process.join(5)
+        assert stack == [0, 2, 4, 6, 8]
+        assert process.exitcode == 0
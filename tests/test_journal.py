@@ -0,0 +1,128 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from pymitter import EventEmitter
+from pymitter.journal import Journal
+from pymitter.transport import JSONSerializer
+
+
+class JournalTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "journal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_record_replay(self):
+        ee = EventEmitter()
+        with Journal(self.directory) as journal:
+            journal.attach(ee)
+            ee.emit("foo.bar", 1, key="a")
+            ee.emit_many("foo.baz", [(2,), (3,)])
+            journal.record("bar", (4,))
+            journal.detach(ee)
+            ee.emit("foo.bar", 5)
+
+            # records are only written on flush
+            assert os.path.getsize(journal.segments[0]) == 0
+            journal.flush()
+            assert os.path.getsize(journal.segments[0]) > 0
+
+            records = list(journal.read())
+            assert [record[1:] for record in records] == [
+                ("foo.bar", (1,), {"key": "a"}),
+                ("foo.baz", (2,), {}),
+                ("foo.baz", (3,), {}),
+                ("bar", (4,), {}),
+            ]
+            timestamps = [record[0] for record in records]
+            assert timestamps == sorted(timestamps)
+
+        # replay into another emitter, with filters
+        stack = []
+        ee = EventEmitter(wildcard=True)
+        ee.on("foo.*", lambda *args, **kwargs: stack.append((args, kwargs)))
+        ee.on("bar", lambda *args: stack.append(args))
+
+        with Journal(self.directory) as journal:
+            assert journal.replay(ee, batch_size=2) == 4
+            assert stack == [((1,), {"key": "a"}), ((2,), {}), ((3,), {}), (4,)]
+
+            del stack[:]
+            assert journal.replay(ee, "foo.*") == 3
+            assert journal.replay(ee, ["bar", "baz"]) == 1
+            assert journal.replay(ee, "*.baz", start=timestamps[2], end=timestamps[2]) == 1
+            assert stack == [((1,), {"key": "a"}), ((2,), {}), ((3,), {}), (4,), ((3,), {})]
+
+            # no new segment before the first record
+            assert len(journal.segments) == 1
+
+    def test_segments(self):
+        with Journal(self.directory, segment_size=1000, index_interval=100) as journal:
+            for i in range(100):
+                journal.record(f"event.{i % 3}", (i,))
+            assert len(journal.segments) > 1
+            assert all(os.path.getsize(path) <= 1000 for path in journal.segments)
+            records = list(journal.read())
+            assert [record[2] for record in records] == [(i,) for i in range(100)]
+
+            # time ranges seek to indexed records within segments
+            timestamps = [record[0] for record in records]
+            selected = list(journal.read(start=timestamps[40], end=timestamps[60]))
+            assert [record[2][0] for record in selected] == [
+                i for i in range(100) if timestamps[40] <= timestamps[i] <= timestamps[60]
+            ]
+            assert list(journal.read(start=timestamps[-1] + 1)) == []
+            assert list(journal.read(end=timestamps[0] - 1)) == []
+
+        # opening a journal again starts a new segment
+        n = len(os.listdir(self.directory))
+        with Journal(self.directory) as journal:
+            journal.record("event.0", (100,))
+            assert len(os.listdir(self.directory)) == n + 2
+            assert [record[2] for record in journal.read("event.0")][-2:] == [(99,), (100,)]
+
+    def test_clock_moved_back(self):
+        with Journal(self.directory, index_interval=1) as journal:
+            for i in range(10):
+                journal.record("foo", (i,))
+            last_time = list(journal.read())[-1][0]
+
+        # reopened journals continue with the last timestamp when the clock moved back in the meantime
+        with mock.patch("time.time", return_value=last_time - 3600), Journal(self.directory) as journal:
+            for i in range(10, 20):
+                journal.record("foo", (i,))
+
+        with Journal(self.directory) as journal:
+            records = list(journal.read())
+            timestamps = [record[0] for record in records]
+            assert timestamps == sorted(timestamps)
+            assert timestamps[10:] == [last_time] * 10
+
+            selected = journal.read(start=timestamps[5], end=timestamps[-1])
+            assert [record[2][0] for record in selected] == list(range(5, 20))
+
+    def test_truncated(self):
+        with Journal(self.directory, serializer=JSONSerializer()) as journal:
+            journal.record("foo", (1,))
+            journal.record("foo", (2,))
+            path = journal.segments[0]
+
+        # records written partially, e.g. on a crash, are ignored
+        with open(path, "r+b") as f:
+            f.truncate(os.path.getsize(path) - 1)
+        with Journal(self.directory, serializer=JSONSerializer()) as journal:
+            assert [record[2] for record in journal.read()] == [(1,)]
+
+    def test_interval(self):
+        with Journal(self.directory, interval=0.01, sync=True) as journal:
+            journal.record("foo", (1,))
+            path = journal.segments[0]
+            deadline = time.monotonic() + 5
+            while os.path.getsize(path) == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert os.path.getsize(path) > 0
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+import pytest
+
+from pymitter import EventEmitter
+from pymitter.transport import Client, JSONSerializer, Server, header
+
+
+async def wait_for(condition, timeout=5.0):
+    # waits until condition returns a true value
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        if loop.time() > deadline:
+            raise TimeoutError
+        await asyncio.sleep(0.001)
+
+
+class TransportTestCase(unittest.IsolatedAsyncioTestCase):
+    async def test_tcp(self):
+        stack = []
+        ee = EventEmitter(wildcard=True)
+        ee.on("orders.*", lambda arg, key=None: stack.append(("local", arg, key)))
+        remote_ee = EventEmitter(wildcard=True)
+        remote_ee.on("orders.*", lambda arg, key=None: stack.append(("remote", arg, key)))
+
+        async with Server(ee) as server, Client(remote_ee) as client:
+            await server.start()
+            host, port = server.address[:2]
+            await client.connect(host=host, port=port)
+            assert client.connected
+
+            # nothing is published before subscribing
+            await wait_for(lambda: len(server.connections) == 1)
+            assert server.publish("orders.created", 0) == 0
+
+            await client.subscribe("orders.*")
+            assert server.connections[0].patterns == ["orders.*"]
+            await server.emit("orders.created", 1, key="a")
+            assert server.publish("users.created", 2) == 0
+            await wait_for(lambda: len(stack) == 2)
+            assert stack == [("local", 1, "a"), ("remote", 1, "a")]
+
+            await client.unsubscribe("orders.*")
+            assert server.publish("orders.created", 3) == 0
+
+        assert not client.connected
+
+    @unittest.skipUnless(hasattr(asyncio, "start_unix_server"), "requires unix domain sockets")
+    async def test_unix(self):
+        stack = []
+        ee = EventEmitter()
+        ee.on("foo", lambda *args: stack.append(args))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pymitter.sock")
+            serializer = JSONSerializer()
+            async with Server(EventEmitter(), serializer=serializer) as server:
+                await server.start(path)
+                assert server.address == path
+
+                async with Client(ee, serializer=serializer) as client:
+                    await client.connect(path)
+                    await client.subscribe("foo", "bar")
+                    for i in range(100):
+                        server.publish("foo", i, [i])
+                    await wait_for(lambda: len(stack) == 100)
+                    assert stack[-1] == (99, [99])
+
+                # the server notices closed connections
+                await wait_for(lambda: not server.connections)
+
+    async def test_coalescing(self):
+        ee = EventEmitter()
+        stack: list[int | str] = []
+        ee.on("foo", stack.append)
+
+        async with Server(EventEmitter(), coalesce_size=1000) as server, Client(ee) as client:
+            await server.start()
+            await client.connect(port=server.address[1])
+            await client.subscribe("foo")
+
+            # count writes
+            conn = server.connections[0]
+            writes: list[int] = []
+            write = conn.writer.write
+
+            def count_write(data):
+                writes.append(len(data))
+                write(data)
+
+            conn.writer.write = count_write  # type: ignore[method-assign]
+
+            # frames published within one iteration of the loop are written at once
+            for i in range(10):
+                server.publish("foo", i)
+            assert writes == []
+            await wait_for(lambda: len(stack) == 10)
+            assert len(writes) == 1
+
+            # large buffers are written right away
+            server.publish("foo", "x" * 1000)
+            assert len(writes) == 2
+
+        # delayed writes
+        async with Server(EventEmitter(), delay=0.05) as server, Client(ee) as client:
+            await server.start()
+            await client.connect(port=server.address[1])
+            await client.subscribe("foo")
+
+            del stack[:]
+            server.publish("foo", 1)
+            await asyncio.sleep(0.01)
+            server.publish("foo", 2)
+            assert stack == []
+            await wait_for(lambda: len(stack) == 2)
+
+    async def test_slow_consumer(self):
+        payload = "x" * 10000
+
+        for policy in ["drop", "disconnect"]:
+            async with Server(EventEmitter(), max_buffer=100000, policy=policy) as server:
+                await server.start()
+
+                # raw client that subscribes but never reads
+                _, writer = await asyncio.open_connection(port=server.address[1])
+                data = json.dumps(["subscribe", ["foo"]]).encode("utf-8")
+                writer.write(header.pack(len(data)) + data)
+                await wait_for(lambda: server.connections and server.connections[0].patterns)
+                conn = server.connections[0]
+
+                # publish until the socket buffers are full and the buffer limit is reached
+                for _ in range(1000):
+                    server.publish("foo", payload)
+                    await asyncio.sleep(0)
+                    if conn.dropped or conn.closed:
+                        break
+
+                if policy == "drop":
+                    assert conn.dropped > 0
+                    assert not conn.closed
+                else:
+                    assert conn.closed
+                    await wait_for(lambda: not server.connections)
+
+                writer.close()
+
+    async def test_listener_exception(self):
+        ee = EventEmitter()
+        stack: list[int] = []
+        ee.on("foo", lambda arg: 1 / arg)
+        ee.on("foo", stack.append)
+
+        loop = asyncio.get_running_loop()
+        errors = []
+        loop.set_exception_handler(lambda loop, context: errors.append(context["exception"]))
+
+        async with Server(EventEmitter()) as server, Client(ee) as client:
+            await server.start()
+            await client.connect(port=server.address[1])
+            await client.subscribe("foo")
+            server.publish("foo", 0)
+            server.publish("foo", 1)
+            await wait_for(lambda: stack == [1])
+            assert isinstance(errors[0], ZeroDivisionError)
+
+    async def test_control_frames(self):
+        # requests are json encoded regardless of the serializer, so pickled requests are never loaded
+        async with Server(EventEmitter()) as server:
+            await server.start()
+            for data in [pickle.dumps(["subscribe", ["foo"]]), json.dumps(["publish", ["foo"]]).encode("utf-8")]:
+                reader, writer = await asyncio.open_connection(port=server.address[1])
+                writer.write(header.pack(len(data)) + data)
+                assert await reader.read() == b""
+                await wait_for(lambda: not server.connections)
+                writer.close()
+
+    async def test_max_frame_size(self):
+        # oversized frames close the connection without reading them
+        async with Server(EventEmitter(), max_frame_size=100) as server:
+            await server.start()
+            reader, writer = await asyncio.open_connection(port=server.address[1])
+            writer.write(header.pack(101))
+            assert await reader.read() == b""
+            await wait_for(lambda: not server.connections)
+            writer.close()
+
+        stack: list[str] = []
+        ee = EventEmitter()
+        ee.on("foo", stack.append)
+        async with Server(EventEmitter()) as server, Client(ee, max_frame_size=1000) as client:
+            await server.start()
+            await client.connect(port=server.address[1])
+            await client.subscribe("foo")
+            server.publish("foo", "x")
+            server.publish("foo", "x" * 1000)
+            await asyncio.wait_for(client.wait_closed(), 5)
+            assert stack == ["x"]
+            assert not client.connected
+
+    async def test_malformed_messages(self):
+        # clients close the connection on messages that cannot be decoded
+        for data in [b"garbage", pickle.dumps(["event", "foo"]), pickle.dumps(["ack", "foo", [], {}])]:
+            frames: asyncio.Queue[bytes] = asyncio.Queue()
+
+            async def handle(reader, writer, data=data, frames=frames):
+                writer.write(header.pack(len(data)) + data)
+                await frames.put(await reader.read())
+                writer.close()
+
+            server = await asyncio.start_server(handle, "127.0.0.1", 0)
+            client = Client(EventEmitter())
+            await client.connect(port=server.sockets[0].getsockname()[1])
+            await asyncio.wait_for(client.wait_closed(), 5)
+            assert not client.connected
+            assert await asyncio.wait_for(frames.get(), 5) == b""
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+    def test_policy(self):
+        with pytest.raises(ValueError, match="unknown policy"):
+            Server(EventEmitter(), policy="block")